@@ -0,0 +1,102 @@
+from fastapi import Depends, HTTPException, Request, status
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+
+from services.admin_service import AdminService
+from services.agent_service import AgentService
+from services.auth_service import AuthService
+from services.github_service import GitHubService
+from services.media_service import MediaService
+from services.project_service import ProjectService
+from services.supabase_service import SupabaseService
+from services.visual_editor_service import VisualEditorService
+from infrastructure.cache import ResultCache
+from infrastructure.write_buffer import WriteBuffer
+
+# Security
+security = HTTPBearer(auto_error=False)
+
+def get_auth_service(request: Request) -> AuthService:
+    """Return the application-wide auth service"""
+    return request.app.state.auth_service
+
+def get_admin_service(request: Request) -> AdminService:
+    """Return the application-wide admin service"""
+    return request.app.state.admin_service
+
+def get_admin_response_cache(request: Request):
+    """Return the cache of serialized admin dashboard and analytics responses"""
+    return request.app.state.admin_response_cache
+
+def get_project_service(request: Request) -> ProjectService:
+    """Return the application-wide project service"""
+    return request.app.state.project_service
+
+def get_agent_service(request: Request) -> AgentService:
+    """Return the application-wide agent service"""
+    return request.app.state.agent_service
+
+def get_agent_result_cache(request: Request) -> ResultCache:
+    """Return the cache shared by the agent routes"""
+    return request.app.state.agent_result_cache
+
+def get_generation_buffer(request: Request) -> WriteBuffer:
+    """Return the buffered writer for agent generations"""
+    return request.app.state.generation_buffer
+
+def get_visual_editor_service(request: Request) -> VisualEditorService:
+    """Return the application-wide visual editor service"""
+    return request.app.state.visual_editor_service
+
+def get_github_service(request: Request) -> GitHubService:
+    """Return the application-wide GitHub service"""
+    return request.app.state.github_service
+
+def get_supabase_service(request: Request) -> SupabaseService:
+    """Return the application-wide Supabase service"""
+    return request.app.state.supabase_service
+
+def get_media_service(request: Request) -> MediaService:
+    """Return the application-wide media service"""
+    return request.app.state.media_service
+
+async def get_current_user(
+    credentials: HTTPAuthorizationCredentials = Depends(security),
+    auth_service: AuthService = Depends(get_auth_service)
+):
+    """Get current user from token"""
+    if not credentials:
+        return None
+
+    try:
+        return await auth_service.get_user_for_token(credentials.credentials)
+    except:
+        return None
+
+async def require_auth(user = Depends(get_current_user)):
+    """Require authentication"""
+    if not user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+    return user
+
+async def require_admin(
+    current_user = Depends(get_current_user),
+    admin_service: AdminService = Depends(get_admin_service)
+):
+    """Require admin privileges"""
+    if not current_user:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Authentication required"
+        )
+
+    is_admin = await admin_service.is_admin(current_user["id"])
+    if not is_admin:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin privileges required"
+        )
+
+    return current_user
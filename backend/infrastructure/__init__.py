@@ -0,0 +1 @@
+# Infrastructure package
\ No newline at end of file
@@ -0,0 +1,112 @@
+import hashlib
+import json
+import os
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+import orjson
+from cachetools import TLRUCache
+from fastapi.responses import Response
+
+from infrastructure.conditional import etag_matches
+
+
+def cache_key(namespace: str, *parts: Any) -> str:
+    """Build a stable cache key from a namespace and arbitrary JSON-able parts"""
+    digest = hashlib.sha256(
+        json.dumps(parts, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"{namespace}:{digest}"
+
+
+def _entry_ttu(key: str, entry: Tuple[float, Any], now: float) -> float:
+    return now + entry[0]
+
+
+class ResultCache:
+    """Exact-match TTL cache for expensive results; `set` may override the TTL"""
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 3600):
+        self._ttl = ttl
+        self._cache: TLRUCache = TLRUCache(maxsize=maxsize, ttu=_entry_ttu)
+
+    async def get(self, key: str) -> Optional[Any]:
+        entry = self._cache.get(key)
+        return None if entry is None else entry[1]
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        self._cache[key] = (ttl or self._ttl, value)
+
+    async def delete(self, key: str) -> None:
+        self._cache.pop(key, None)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        for key in [key for key in list(self._cache.keys()) if key.startswith(prefix)]:
+            self._cache.pop(key, None)
+
+    async def close(self) -> None:
+        self._cache.clear()
+
+
+class RedisResultCache:
+    """Shared TTL cache in Redis; values must be bytes or str"""
+
+    def __init__(self, url: str, ttl: int = 3600):
+        import redis.asyncio as redis
+
+        self._redis = redis.from_url(url)
+        self._ttl = ttl
+
+    async def get(self, key: str) -> Optional[bytes]:
+        return await self._redis.get(key)
+
+    async def set(self, key: str, value: Any, ttl: Optional[int] = None) -> None:
+        await self._redis.set(key, value, ex=ttl or self._ttl)
+
+    async def delete(self, key: str) -> None:
+        await self._redis.delete(key)
+
+    async def delete_prefix(self, prefix: str) -> None:
+        keys = [key async for key in self._redis.scan_iter(match=f"{prefix}*")]
+        if keys:
+            await self._redis.delete(*keys)
+
+    async def close(self) -> None:
+        await self._redis.aclose()
+
+
+def create_shared_cache(maxsize: int = 1024, ttl: int = 3600):
+    """Use Redis when REDIS_URL is configured, otherwise an in-process cache"""
+    redis_url = os.environ.get("REDIS_URL")
+    if redis_url:
+        return RedisResultCache(redis_url, ttl=ttl)
+    return ResultCache(maxsize=maxsize, ttl=ttl)
+
+
+async def cached_json_response(
+    cache,
+    key: str,
+    build: Callable[[], Awaitable[Any]],
+    headers_for: Optional[Callable[[Any], Dict[str, str]]] = None,
+    ttl: Optional[int] = None,
+    if_none_match: Optional[str] = None
+) -> Response:
+    """Serve JSON from `cache`, building and storing it on a miss
+
+    Entries are the response headers and body joined by a newline, which
+    compact orjson output never contains. Each entry carries an ETag of its
+    body, so a client already holding it gets an empty 304 instead.
+    """
+    entry = await cache.get(key)
+    if entry is None:
+        payload = await build()
+        headers = headers_for(payload) if headers_for else {}
+        body = orjson.dumps(payload, option=orjson.OPT_NON_STR_KEYS)
+        headers["ETag"] = f'W/"{hashlib.sha256(body).hexdigest()[:32]}"'
+        entry = orjson.dumps(headers) + b"\n" + body
+        await cache.set(key, entry, ttl)
+    head, body = entry.split(b"\n", 1)
+    headers = orjson.loads(head)
+    etag = headers.get("ETag")
+    if etag and etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
@@ -0,0 +1,73 @@
+from typing import List
+
+
+def strip_fences(response: str) -> str:
+    """Remove a ``` opening fence line and a closing ``` line from a whole response"""
+    code = response.strip()
+    if code.startswith("```"):
+        # Slice around the first and last newline rather than splitting every line
+        code = code.partition("\n")[2]
+        head, _, last = code.rpartition("\n")
+        if last.strip() == "```":
+            code = head
+    return code
+
+
+class FenceStripper:
+    """Drop a leading ``` fence line and its closing fence from text arriving in chunks
+
+    Streaming counterpart of strip_fences. Lines are released as
+    they complete; blank or fence lines are held back until something follows
+    them, since they may turn out to be the response's closing fence.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._started = False
+        self._fenced = False
+        self._pending: List[str] = []
+        self._emitted = False
+        self._held_space = ""
+
+    def _emit(self, lines: List[str]) -> str:
+        out = []
+        for line in lines:
+            if self._emitted:
+                out.append(self._held_space + "\n")
+            # Trailing spaces wait for the next line; at the very end they are stripped
+            content = line.rstrip()
+            self._held_space = line[len(content):]
+            out.append(content)
+            self._emitted = True
+        return "".join(out)
+
+    def feed(self, text: str) -> str:
+        self._buffer += text
+        if not self._started:
+            self._buffer = self._buffer.lstrip()
+        *lines, self._buffer = self._buffer.split("\n")
+        out = []
+        for line in lines:
+            if not self._started:
+                self._started = True
+                if line.startswith("```"):
+                    self._fenced = True
+                    continue
+            if line.strip() in ("", "```"):
+                self._pending.append(line)
+            else:
+                out.append(self._emit(self._pending + [line]))
+                self._pending = []
+        return "".join(out)
+
+    def close(self) -> str:
+        if not self._started:
+            text = self._buffer.strip()
+            return "" if text.startswith("```") else self._emit([text])
+        tail = "\n".join(self._pending + [self._buffer]).rstrip()
+        if not tail:
+            return ""
+        lines = tail.split("\n")
+        if self._fenced and lines[-1].strip() == "```":
+            lines.pop()
+        return self._emit(lines)
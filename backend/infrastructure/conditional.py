@@ -0,0 +1,17 @@
+from datetime import datetime
+from typing import Optional
+
+
+def weak_etag(resource_id: str, updated_at: datetime) -> str:
+    """Weak validator for a document identified by id and last update time (to the millisecond)"""
+    return f'W/"{resource_id}-{round(updated_at.timestamp() * 1000)}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Whether an If-None-Match header already names `etag` (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
@@ -0,0 +1,21 @@
+import os
+from typing import FrozenSet
+
+from starlette.middleware.cors import CORSMiddleware
+from starlette.types import ASGIApp
+
+
+def load_allowed_origins() -> FrozenSet[str]:
+    """Allowed origins from the comma-separated CORS_ORIGINS ("*" keeps local development open)"""
+    return frozenset(
+        origin.strip() for origin in os.environ.get("CORS_ORIGINS", "*").split(",") if origin.strip()
+    )
+
+
+class AllowlistCORSMiddleware(CORSMiddleware):
+    """CORSMiddleware that checks origins against a frozenset instead of a list"""
+
+    def __init__(self, app: ASGIApp, allow_origins: FrozenSet[str] = frozenset(), **kwargs):
+        super().__init__(app, allow_origins=list(allow_origins), **kwargs)
+        # Starlette tests `origin in self.allow_origins` on every request
+        self.allow_origins = frozenset(allow_origins)
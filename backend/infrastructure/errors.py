@@ -0,0 +1,47 @@
+import logging
+
+import orjson
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+logger = logging.getLogger(__name__)
+
+# Fixed body for uncaught errors; details go to the log, never to the client
+ERROR_BODY = orjson.dumps({"success": False, "error": "Internal server error", "message": "Request failed"})
+ERROR_HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(ERROR_BODY)).encode()),
+]
+
+
+class UnhandledErrorMiddleware:
+    """Log uncaught errors and answer 500 in the integration routes' envelope
+
+    Installed inside the CORS middleware so browsers can read the error,
+    unlike an app-level Exception handler, which Starlette runs outermost.
+    """
+
+    def __init__(self, app: ASGIApp):
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        response_started = False
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        except Exception:
+            logger.exception("Unhandled error on %s %s", scope["method"], scope["path"])
+            if response_started:
+                # Too late for a 500; let the server drop the connection
+                raise
+            await send({"type": "http.response.start", "status": 500, "headers": ERROR_HEADERS})
+            await send({"type": "http.response.body", "body": ERROR_BODY})
@@ -0,0 +1,31 @@
+from typing import FrozenSet
+
+import orjson
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+HEALTH_BODY = orjson.dumps({"message": "Lovable Clone API v1.0.0", "status": "online"})
+HEALTH_HEADERS = [
+    (b"content-type", b"application/json"),
+    (b"content-length", str(len(HEALTH_BODY)).encode()),
+]
+
+
+class HealthCheckMiddleware:
+    """Answer health-check GET/HEAD requests before routing, dependencies or logging run"""
+
+    def __init__(self, app: ASGIApp, paths: FrozenSet[str] = frozenset({"/api/"})):
+        self.app = app
+        self.paths = paths
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope["type"] != "http"
+            or scope["path"] not in self.paths
+            or scope["method"] not in ("GET", "HEAD")
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        await send({"type": "http.response.start", "status": 200, "headers": HEALTH_HEADERS})
+        body = b"" if scope["method"] == "HEAD" else HEALTH_BODY
+        await send({"type": "http.response.body", "body": body})
@@ -0,0 +1,82 @@
+import asyncio
+import logging
+import os
+from typing import Any, Dict, List, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+logger = logging.getLogger(__name__)
+
+# How long system log events are kept before MongoDB expires them
+SYSTEM_LOG_RETENTION_SECONDS = int(os.environ.get("SYSTEM_LOG_RETENTION_DAYS", 30)) * 24 * 3600
+
+# (collection, keys, options) backing the hot query paths
+INDEXES: List[Tuple[str, List[Tuple[str, int]], Dict[str, Any]]] = [
+    # User lookups by public id (owner emails, sessions); older users may lack it
+    ("users", [("id", 1)], {}),
+    # Admin user management
+    ("users", [("created_at", -1), ("id", -1)], {}),
+    ("users", [("is_active", 1), ("created_at", -1)], {}),
+    # Project lookups by public id
+    ("projects", [("id", 1)], {"unique": True}),
+    # Keyset pages of the public project listing
+    ("projects", [("is_public", 1), ("is_featured", -1), ("likes_count", -1), ("created_at", -1), ("id", -1)], {}),
+    # Admin project management and the per-owner joins / cascades
+    ("projects", [("created_at", -1), ("id", -1)], {}),
+    ("projects", [("owner_id", 1)], {}),
+    ("projects", [("updated_at", -1), ("is_public", 1)], {}),
+    # Admin system logs
+    ("system_logs", [("timestamp", -1), ("id", -1)], {}),
+    ("system_logs", [("level", 1), ("timestamp", -1), ("id", -1)], {}),
+    # Dashboard API-call count for today
+    ("system_logs", [("component", 1), ("timestamp", -1)], {}),
+    # Chat history, read per session in timestamp order
+    ("chat_messages", [("session_id", 1), ("timestamp", 1)], {}),
+    # AI code generation history
+    ("code_generations", [("session_id", 1), ("created_at", -1)], {}),
+    # Range scan feeding the daily analytics rollup
+    ("code_generations", [("created_at", -1)], {}),
+    # Precomputed admin analytics
+    ("analytics_rollups", [("date", 1), ("metric", 1)], {"unique": True}),
+]
+
+
+async def ensure_system_logs(db: AsyncIOMotorDatabase) -> None:
+    """Give system_logs bounded retention
+
+    A new deployment gets a time-series collection (MongoDB 5.0+) bucketed on
+    timestamp and component, which expires events itself. An existing or
+    pre-5.0 collection is left as is and expires events through a TTL index.
+    Time-series collections do not enforce a unique _id, which is why the
+    system log write buffer does not retry failed batches.
+    """
+    existing = await db.list_collections(filter={"name": "system_logs"}).to_list(1)
+    if existing and existing[0].get("type") == "timeseries":
+        return
+    if not existing:
+        try:
+            await db.create_collection(
+                "system_logs",
+                timeseries={"timeField": "timestamp", "metaField": "component", "granularity": "seconds"},
+                expireAfterSeconds=SYSTEM_LOG_RETENTION_SECONDS
+            )
+            return
+        except Exception as e:
+            logger.warning("Could not create system_logs as a time-series collection: %s", e)
+    try:
+        await db.system_logs.create_index([("timestamp", 1)], expireAfterSeconds=SYSTEM_LOG_RETENTION_SECONDS)
+    except Exception as e:
+        logger.warning("Could not create the system_logs TTL index: %s", e)
+
+
+async def ensure_indexes(db: AsyncIOMotorDatabase) -> None:
+    """Create every declared index; failures are logged, not raised"""
+    # Must run first: creating an index would implicitly create a plain collection
+    await ensure_system_logs(db)
+    results = await asyncio.gather(
+        *[db[collection].create_index(keys, **options) for collection, keys, options in INDEXES],
+        return_exceptions=True
+    )
+    for (collection, keys, _), result in zip(INDEXES, results):
+        if isinstance(result, Exception):
+            logger.warning("Could not create index %s on %s: %s", keys, collection, result)
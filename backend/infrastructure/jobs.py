@@ -0,0 +1,58 @@
+import asyncio
+import logging
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from cachetools import TTLCache
+
+from models.common import new_id, utc_now
+
+logger = logging.getLogger(__name__)
+
+
+class Job:
+    """State of one background job; `done` is set once it finishes"""
+
+    def __init__(self):
+        self.id = new_id()
+        self.status = "pending"
+        self.result: Optional[Any] = None
+        self.error: Optional[str] = None
+        self.created_at = utc_now()
+        self.done = asyncio.Event()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at
+        }
+
+
+class JobRegistry:
+    """In-process registry of background jobs, forgotten after `ttl` seconds"""
+
+    def __init__(self, maxsize: int = 1024, ttl: int = 3600):
+        self._jobs: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    def create(self) -> Job:
+        job = Job()
+        self._jobs[job.id] = job
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        return self._jobs.get(job_id)
+
+    async def run(self, job: Job, func: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> None:
+        """Run `func` and record its outcome on `job`"""
+        job.status = "running"
+        try:
+            job.result = await func(*args, **kwargs)
+            job.status = "completed"
+        except Exception as e:
+            logger.error("Job %s failed: %s", job.id, e)
+            job.error = str(e)
+            job.status = "failed"
+        finally:
+            job.done.set()
@@ -0,0 +1,41 @@
+import os
+from typing import Optional
+
+from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+
+_client: Optional[AsyncIOMotorClient] = None
+
+# Shared read projection: the ObjectId never crosses the wire or reaches responses
+NO_ID_PROJECTION = {"_id": 0}
+
+
+def get_mongo() -> AsyncIOMotorClient:
+    """Return the process-wide Motor client, creating it on first use"""
+    global _client
+    if _client is None:
+        _client = AsyncIOMotorClient(
+            os.environ['MONGO_URL'],
+            maxPoolSize=int(os.environ.get('MONGO_MAX_POOL_SIZE', 200)),
+            minPoolSize=int(os.environ.get('MONGO_MIN_POOL_SIZE', 20)),
+            maxIdleTimeMS=300000,
+            # Fail a request that cannot get a connection instead of queueing it indefinitely
+            waitQueueTimeoutMS=int(os.environ.get('MONGO_WAIT_QUEUE_TIMEOUT_MS', 2000)),
+            serverSelectionTimeoutMS=2000,
+            retryWrites=True,
+            # Compress wire traffic; zlib is the fallback when zstd is unavailable
+            compressors=os.environ.get('MONGO_COMPRESSORS', 'zstd,zlib'),
+        )
+    return _client
+
+
+def get_db() -> AsyncIOMotorDatabase:
+    """Return the application database on the shared client"""
+    return get_mongo()[os.environ['DB_NAME']]
+
+
+def close_mongo() -> None:
+    """Close the shared client and release its pooled connections"""
+    global _client
+    if _client is not None:
+        _client.close()
+        _client = None
@@ -0,0 +1,36 @@
+from typing import Any, Callable, Coroutine
+
+import ormsgpack
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+MSGPACK_CONTENT_TYPES = {"application/msgpack", "application/x-msgpack"}
+
+
+class MsgPackRequest(Request):
+    """Request whose body is MessagePack but is handed to FastAPI as parsed JSON"""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = ormsgpack.unpackb(await self.body())
+        return self._json
+
+
+class MsgPackRoute(APIRoute):
+    """Route that also accepts `Content-Type: application/msgpack` bodies; JSON stays the default"""
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        original_route_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            content_type = request.headers.get("content-type", "").split(";", 1)[0].strip().lower()
+            if content_type in MSGPACK_CONTENT_TYPES:
+                # FastAPI only calls request.json() for JSON content types
+                scope = dict(request.scope)
+                scope["headers"] = [
+                    (name, value) for name, value in request.scope["headers"] if name != b"content-type"
+                ] + [(b"content-type", b"application/json")]
+                request = MsgPackRequest(scope, request.receive)
+            return await original_route_handler(request)
+
+        return route_handler
@@ -0,0 +1,55 @@
+import base64
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+import orjson
+
+# A sort spec is the ordered (field, direction) list a listing is read in; it
+# must end in a unique field so every document has a distinct position.
+SortSpec = List[Tuple[str, int]]
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return {"$date": value.isoformat()}
+    return value
+
+
+def _decode_value(value: Any) -> Any:
+    if isinstance(value, dict) and "$date" in value:
+        return datetime.fromisoformat(value["$date"])
+    return value
+
+
+def encode_cursor(doc: Dict[str, Any], sort: SortSpec) -> str:
+    """Opaque cursor pointing just past `doc` in a listing ordered by `sort`"""
+    values = [_encode_value(doc.get(field)) for field, _ in sort]
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode()
+
+
+def decode_cursor(cursor: str, sort: SortSpec) -> List[Any]:
+    """Sort-key values stored in a cursor; raises ValueError when malformed"""
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except Exception as e:
+        raise ValueError("Invalid cursor") from e
+    if not isinstance(values, list) or len(values) != len(sort):
+        raise ValueError("Invalid cursor")
+    return [_decode_value(value) for value in values]
+
+
+def keyset_filter(sort: SortSpec, values: List[Any]) -> Dict[str, Any]:
+    """Match documents strictly after `values` in `sort` order"""
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        branch = {prior: values[j] for j, (prior, _) in enumerate(sort[:i])}
+        branch[field] = {"$lt" if direction < 0 else "$gt": values[i]}
+        branches.append(branch)
+    return {"$or": branches}
+
+
+def next_cursor(docs: List[Dict[str, Any]], sort: SortSpec, limit: int) -> Optional[str]:
+    """Cursor for the page after `docs`, or None when this was the last page"""
+    if len(docs) < limit:
+        return None
+    return encode_cursor(docs[-1], sort)
@@ -0,0 +1,27 @@
+import asyncio
+from typing import Any, Awaitable, Callable, Dict
+
+
+class SingleFlight:
+    """Share one in-flight call among concurrent callers asking for the same key"""
+
+    def __init__(self):
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, func: Callable[[], Awaitable[Any]]) -> Any:
+        """Await the call already running for `key`, or start it with `func`"""
+        task = self._inflight.get(key)
+        if task is None:
+            # The call runs as its own task, so no caller (the first included)
+            # cancels it for the others by disconnecting
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._finish(key, done))
+        return await asyncio.shield(task)
+
+    def _finish(self, key: str, task: asyncio.Future) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        if not task.cancelled():
+            # Mark retrieved so a failure nobody was left waiting for is not reported
+            task.exception()
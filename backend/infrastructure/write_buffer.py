@@ -0,0 +1,101 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Tuple
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo.errors import BulkWriteError, ConnectionFailure
+
+logger = logging.getLogger(__name__)
+
+# Attempts per batch when the server is briefly unreachable
+WRITE_ATTEMPTS = 3
+
+# Queued by stop(): everything ahead of it is written before the flusher exits
+_STOP = object()
+
+
+class WriteBuffer:
+    """Queue documents in memory and insert them in batches from a background task
+
+    Pass retry=False for time-series collections: they do not enforce a unique
+    _id, so retrying a batch that partly landed would store duplicates.
+    """
+
+    def __init__(self, collection: AsyncIOMotorCollection, max_batch: int = 500, flush_interval: float = 0.1, retry: bool = True):
+        self.collection = collection
+        self.max_batch = max_batch
+        self.flush_interval = flush_interval
+        self.attempts = WRITE_ATTEMPTS if retry else 1
+        self._queue: asyncio.Queue = asyncio.Queue()
+        self._task: Optional[asyncio.Task] = None
+
+    def put(self, document: Dict[str, Any]) -> None:
+        """Enqueue a document without waiting for the database"""
+        self._queue.put_nowait(document)
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def _run(self) -> None:
+        while True:
+            first = await self._queue.get()
+            if first is _STOP:
+                return
+            if self._queue.qsize() < self.max_batch:
+                await asyncio.sleep(self.flush_interval)
+            batch, stopping = self._drain(self.max_batch - 1)
+            await asyncio.shield(self._write([first] + batch))
+            if stopping:
+                return
+
+    def _drain(self, limit: int) -> Tuple[List[Dict[str, Any]], bool]:
+        """Take up to limit queued documents; the flag is set if the stop marker was reached"""
+        documents = []
+        while len(documents) < limit and not self._queue.empty():
+            document = self._queue.get_nowait()
+            if document is _STOP:
+                return documents, True
+            documents.append(document)
+        return documents, False
+
+    async def _write(self, batch: List[Dict[str, Any]]) -> None:
+        for attempt in range(1, self.attempts + 1):
+            try:
+                await self.collection.insert_many(batch, ordered=False)
+                return
+            except BulkWriteError as e:
+                # Unordered: the rest of the batch was written. On a retry, duplicate
+                # key errors are documents an earlier attempt already inserted.
+                errors = [err for err in e.details.get("writeErrors", []) if err.get("code") != 11000]
+                if errors:
+                    logger.error("Failed to write %d of %d buffered documents to %s", len(errors), len(batch), self.collection.name)
+                return
+            except ConnectionFailure:
+                if attempt < self.attempts:
+                    # Documents keep the _id assigned on the first attempt, so the
+                    # unique _id index rejects anything already written
+                    await asyncio.sleep(self.flush_interval * 2 ** attempt)
+                    continue
+                logger.exception("Failed to write %d buffered documents to %s", len(batch), self.collection.name)
+                return
+            except Exception:
+                logger.exception("Failed to write %d buffered documents to %s", len(batch), self.collection.name)
+                return
+
+    async def stop(self) -> None:
+        """Stop the flusher once it has written out everything queued so far"""
+        if self._task is not None:
+            if not self._task.done():
+                # Let the flusher finish its batch in hand rather than cancelling it
+                # mid-write, so the caller can close the client safely afterwards
+                self._queue.put_nowait(_STOP)
+            try:
+                await self._task
+            except Exception:
+                logger.exception("Write buffer flusher for %s failed", self.collection.name)
+            self._task = None
+
+        # Anything put() after the stop marker
+        while not self._queue.empty():
+            documents, _ = self._drain(self.max_batch)
+            if documents:
+                await self._write(documents)
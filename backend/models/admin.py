@@ -1,13 +1,13 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-import uuid
+from models.common import new_id, utc_now
 
 class AdminUser(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     user_id: str
     role: str = "admin"  # admin, super_admin
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
     created_by: str
     is_active: bool = True
 
@@ -57,11 +57,13 @@ class ProjectManagement(BaseModel):
     initial_prompt: Optional[str]
 
 class SystemLog(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    model_config = ConfigDict(frozen=True)
+
+    id: str = Field(default_factory=new_id)
     level: str  # INFO, WARNING, ERROR
     message: str
     component: str  # frontend, backend, ai_service
-    timestamp: datetime = Field(default_factory=datetime.utcnow)
+    timestamp: datetime = Field(default_factory=utc_now)
     user_id: Optional[str] = None
     metadata: Optional[Dict[str, Any]] = None
 
@@ -1,4 +1,5 @@
-from pydantic import BaseModel, Field
+import msgspec
+from pydantic import BaseModel, ConfigDict, Field
 from typing import Dict, List, Optional, Any
 from datetime import datetime
 
@@ -18,6 +19,8 @@ class AgentResponse(BaseModel):
     error: Optional[str] = None
 
 class VisualOperation(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     type: str  # add_component, move_component, update_props, etc.
     component_type: Optional[str] = None
     component_id: Optional[str] = None
@@ -31,6 +34,22 @@ class VisualEditRequest(BaseModel):
     current_code: str
     operations: List[VisualOperation]
 
+# msgspec mirrors of the visual editor payload, used to decode large operation
+# batches without building a Pydantic model per operation
+class VisualOperationStruct(msgspec.Struct, frozen=True):
+    type: str
+    component_type: Optional[str] = None
+    component_id: Optional[str] = None
+    props: Optional[Dict[str, Any]] = None
+    parent_id: Optional[str] = None
+    position: Optional[str] = None
+    new_props: Optional[Dict[str, Any]] = None
+    style_changes: Optional[Dict[str, Any]] = None
+
+class VisualEditPayload(msgspec.Struct):
+    current_code: str
+    operations: List[VisualOperationStruct]
+
 class GitHubRequest(BaseModel):
     project_name: str
     description: Optional[str] = ""
@@ -0,0 +1,12 @@
+import uuid
+from datetime import datetime, timezone
+
+_UTC = timezone.utc
+
+def utc_now() -> datetime:
+    """Current time as a timezone-aware UTC datetime"""
+    return datetime.now(_UTC)
+
+def new_id() -> str:
+    """Random opaque identifier (32 hex characters)"""
+    return uuid.uuid4().hex
@@ -1,7 +1,8 @@
+import msgspec
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
-import uuid
+from models.common import new_id, utc_now
 
 class ProjectCreate(BaseModel):
     name: str
@@ -9,12 +10,12 @@ class ProjectCreate(BaseModel):
     initial_prompt: Optional[str] = None
 
 class Project(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     name: str
     description: Optional[str] = None
     initial_prompt: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
     is_public: bool = False
     generated_code: Optional[str] = None
 
@@ -22,6 +23,18 @@ class ChatMessage(BaseModel):
     type: str  # "user" or "assistant"
     content: str
 
+# msgspec mirrors of ChatMessage for the chat write path: the body is decoded
+# and the stored document built without a Pydantic model per message
+class ChatMessageStruct(msgspec.Struct):
+    type: str
+    content: str
+
+class ChatMessageDoc(msgspec.Struct):
+    session_id: str
+    type: str
+    content: str
+    timestamp: datetime
+
 class GenerateCodeRequest(BaseModel):
     prompt: str
-    session_id: str = Field(default_factory=lambda: str(uuid.uuid4()))
\ No newline at end of file
+    session_id: str = Field(default_factory=new_id)
\ No newline at end of file
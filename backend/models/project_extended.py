@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 from datetime import datetime
-import uuid
+from models.common import new_id, utc_now
 
 class ProjectCreate(BaseModel):
     name: str
@@ -15,26 +15,26 @@ class ProjectUpdate(BaseModel):
     is_public: Optional[bool] = None
 
 class ProjectVersion(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     version: str
     code: str
     description: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
 
 class ProjectCollaborator(BaseModel):
     user_id: str
     role: str  # "owner", "editor", "viewer"
-    added_at: datetime = Field(default_factory=datetime.utcnow)
+    added_at: datetime = Field(default_factory=utc_now)
 
 class Project(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     name: str
     description: Optional[str] = None
     initial_prompt: Optional[str] = None
     owner_id: str
     template_id: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
     is_public: bool = False
     is_featured: bool = False
     generated_code: Optional[str] = None
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
 from datetime import datetime
-import uuid
+from models.common import new_id, utc_now
 
 class TemplateCreate(BaseModel):
     name: str
@@ -12,7 +12,7 @@ class TemplateCreate(BaseModel):
     tags: List[str] = []
 
 class Template(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     name: str
     description: str
     category: str
@@ -20,8 +20,8 @@ class Template(BaseModel):
     preview_image: Optional[str] = None
     tags: List[str] = []
     author_id: str
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
     is_featured: bool = False
     is_public: bool = True
     usage_count: int = 0
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, Field, EmailStr
 from typing import List, Optional
 from datetime import datetime
-import uuid
+from models.common import new_id, utc_now
 
 class UserCreate(BaseModel):
     email: EmailStr
@@ -16,14 +16,14 @@ class UserUpdate(BaseModel):
     avatar: Optional[str] = None
 
 class User(BaseModel):
-    id: str = Field(default_factory=lambda: str(uuid.uuid4()))
+    id: str = Field(default_factory=new_id)
     email: EmailStr
     name: str
     username: Optional[str] = None
     bio: Optional[str] = None
     avatar: Optional[str] = None
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
     is_active: bool = True
     is_premium: bool = False
     projects_count: int = 0
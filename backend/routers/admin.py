@@ -1,71 +1,79 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
-from typing import List, Optional, Any
+from fastapi import APIRouter, HTTPException, Depends, Query
+from fastapi.responses import ORJSONResponse
+from typing import List, Optional
 from models.admin import (
     DashboardData, UserManagement, ProjectManagement, 
     SystemLog, PlatformSettings
 )
 from models.user import User
+from services.admin_service import (
+    AdminService, DASHBOARD_CACHE_KEY, USERS_MANAGEMENT_SORT, PROJECTS_MANAGEMENT_SORT, SYSTEM_LOGS_SORT
+)
+from infrastructure.pagination import next_cursor
+from infrastructure.cache import cached_json_response
+from dependencies import get_admin_response_cache, get_admin_service, require_admin
 
+# Services hand back validated models, so list and detail routes serialize them
+# straight to ORJSONResponse; response_model stays only to document the schema.
 router = APIRouter()
 
-# Dependencies will be injected by the main app
+def _cursor_headers(page: List[dict], sort, limit: int) -> dict:
+    """X-Next-Cursor header for a listing page, if another page may follow"""
+    cursor = next_cursor(page, sort, limit)
+    return {"X-Next-Cursor": cursor} if cursor else {}
 
-async def require_admin(current_user: User, admin_service: Any):
-    """Require admin privileges"""
-    if not current_user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required"
-        )
-    
-    is_admin = await admin_service.is_admin(current_user["id"])
-    if not is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin privileges required"
-        )
-    
-    return current_user
+# Seconds a serialized dashboard / analytics response is reused
+DASHBOARD_CACHE_TTL = 60
+ANALYTICS_CACHE_TTL = 300
 
 @router.get("/dashboard", response_model=DashboardData)
 async def get_dashboard(
-    admin_service: Any = Depends(),
+    admin_service: AdminService = Depends(get_admin_service),
+    response_cache = Depends(get_admin_response_cache),
     current_user: User = Depends(require_admin)
 ):
     """Get admin dashboard data"""
     try:
-        dashboard_data = await admin_service.get_dashboard_data()
-        await admin_service.log_system_event(
+        async def build():
+            dashboard_data = await admin_service.get_dashboard_data()
+            return dashboard_data.model_dump()
+
+        response = await cached_json_response(response_cache, DASHBOARD_CACHE_KEY, build, ttl=DASHBOARD_CACHE_TTL)
+        admin_service.log_system_event(
             "INFO", 
             f"Admin dashboard accessed by {current_user['email']}", 
             "admin", 
             current_user["id"]
         )
-        return dashboard_data
+        return response
     except Exception as e:
-        await admin_service.log_system_event("ERROR", f"Dashboard error: {str(e)}", "admin")
+        admin_service.log_system_event("ERROR", f"Dashboard error: {str(e)}", "admin")
         raise HTTPException(status_code=500, detail="Failed to load dashboard")
 
 @router.get("/users", response_model=List[UserManagement])
 async def get_users(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    admin_service: Any = Depends(),
+    cursor: Optional[str] = Query(None),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(require_admin)
 ):
-    """Get users for management"""
+    """Get users for management; follow X-Next-Cursor with `cursor` for the next page"""
     try:
-        users = await admin_service.get_users_management(skip, limit)
-        return users
+        users = await admin_service.get_users_management(skip, limit, cursor)
+        page = [user.model_dump() for user in users]
+        return ORJSONResponse(page, headers=_cursor_headers(page, USERS_MANAGEMENT_SORT, limit))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
-        await admin_service.log_system_event("ERROR", f"Users management error: {str(e)}", "admin")
+        admin_service.log_system_event("ERROR", f"Users management error: {str(e)}", "admin")
         raise HTTPException(status_code=500, detail="Failed to load users")
 
 @router.put("/users/{user_id}/status")
 async def update_user_status(
     user_id: str,
     is_active: bool,
-    admin_service: Any = Depends(),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(require_admin)
 ):
     """Update user active status"""
@@ -73,7 +81,7 @@ async def update_user_status(
         success = await admin_service.update_user_status(user_id, is_active)
         if success:
             action = "activated" if is_active else "deactivated"
-            await admin_service.log_system_event(
+            admin_service.log_system_event(
                 "INFO", 
                 f"User {user_id} {action} by admin {current_user['email']}", 
                 "admin"
@@ -82,28 +90,32 @@ async def update_user_status(
         else:
             raise HTTPException(status_code=404, detail="User not found")
     except Exception as e:
-        await admin_service.log_system_event("ERROR", f"User status update error: {str(e)}", "admin")
+        admin_service.log_system_event("ERROR", f"User status update error: {str(e)}", "admin")
         raise HTTPException(status_code=500, detail="Failed to update user status")
 
 @router.get("/projects", response_model=List[ProjectManagement])
 async def get_projects(
     skip: int = Query(0, ge=0),
     limit: int = Query(50, ge=1, le=100),
-    admin_service: Any = Depends(),
+    cursor: Optional[str] = Query(None),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(require_admin)
 ):
-    """Get projects for management"""
+    """Get projects for management; follow X-Next-Cursor with `cursor` for the next page"""
     try:
-        projects = await admin_service.get_projects_management(skip, limit)
-        return projects
+        projects = await admin_service.get_projects_management(skip, limit, cursor)
+        page = [project.model_dump() for project in projects]
+        return ORJSONResponse(page, headers=_cursor_headers(page, PROJECTS_MANAGEMENT_SORT, limit))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
-        await admin_service.log_system_event("ERROR", f"Projects management error: {str(e)}", "admin")
+        admin_service.log_system_event("ERROR", f"Projects management error: {str(e)}", "admin")
         raise HTTPException(status_code=500, detail="Failed to load projects")
 
 @router.delete("/projects/{project_id}")
 async def delete_project(
     project_id: str,
-    admin_service: Any = Depends(),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(require_admin)
 ):
     """Delete a project"""
@@ -114,41 +126,46 @@ async def delete_project(
         else:
             raise HTTPException(status_code=404, detail="Project not found")
     except Exception as e:
-        await admin_service.log_system_event("ERROR", f"Project deletion error: {str(e)}", "admin")
+        admin_service.log_system_event("ERROR", f"Project deletion error: {str(e)}", "admin")
         raise HTTPException(status_code=500, detail="Failed to delete project")
 
 @router.get("/logs", response_model=List[SystemLog])
 async def get_logs(
     level: Optional[str] = Query(None),
     limit: int = Query(100, ge=1, le=500),
-    admin_service: Any = Depends(),
+    cursor: Optional[str] = Query(None),
+    include_metadata: bool = Query(False),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(require_admin)
 ):
-    """Get system logs"""
+    """Get system logs; follow X-Next-Cursor with `cursor` for the next page"""
     try:
-        logs = await admin_service.get_system_logs(level, limit)
-        return logs
+        logs = await admin_service.get_system_logs(level, limit, cursor, include_metadata)
+        page = [log.model_dump() for log in logs]
+        return ORJSONResponse(page, headers=_cursor_headers(page, SYSTEM_LOGS_SORT, limit))
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
     except Exception as e:
-        await admin_service.log_system_event("ERROR", f"Logs retrieval error: {str(e)}", "admin")
+        admin_service.log_system_event("ERROR", f"Logs retrieval error: {str(e)}", "admin")
         raise HTTPException(status_code=500, detail="Failed to load logs")
 
 @router.get("/settings", response_model=PlatformSettings)
 async def get_settings(
-    admin_service: Any = Depends(),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(require_admin)
 ):
     """Get platform settings"""
     try:
         settings = await admin_service.get_platform_settings()
-        return settings
+        return ORJSONResponse(settings.model_dump())
     except Exception as e:
-        await admin_service.log_system_event("ERROR", f"Settings retrieval error: {str(e)}", "admin")
+        admin_service.log_system_event("ERROR", f"Settings retrieval error: {str(e)}", "admin")
         raise HTTPException(status_code=500, detail="Failed to load settings")
 
 @router.put("/settings")
 async def update_settings(
     settings: PlatformSettings,
-    admin_service: Any = Depends(),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(require_admin)
 ):
     """Update platform settings"""
@@ -159,27 +176,32 @@ async def update_settings(
         else:
             raise HTTPException(status_code=500, detail="Failed to update settings")
     except Exception as e:
-        await admin_service.log_system_event("ERROR", f"Settings update error: {str(e)}", "admin")
+        admin_service.log_system_event("ERROR", f"Settings update error: {str(e)}", "admin")
         raise HTTPException(status_code=500, detail="Failed to update settings")
 
 @router.get("/analytics")
 async def get_analytics(
     days: int = Query(30, ge=1, le=365),
-    admin_service: Any = Depends(),
+    admin_service: AdminService = Depends(get_admin_service),
+    response_cache = Depends(get_admin_response_cache),
     current_user: User = Depends(require_admin)
 ):
     """Get usage analytics"""
     try:
-        analytics = await admin_service.get_usage_analytics(days)
-        return analytics
+        return await cached_json_response(
+            response_cache,
+            f"admin:analytics:{days}",
+            lambda: admin_service.get_usage_analytics(days),
+            ttl=ANALYTICS_CACHE_TTL
+        )
     except Exception as e:
-        await admin_service.log_system_event("ERROR", f"Analytics error: {str(e)}", "admin")
+        admin_service.log_system_event("ERROR", f"Analytics error: {str(e)}", "admin")
         raise HTTPException(status_code=500, detail="Failed to load analytics")
 
 @router.post("/users/{user_id}/make-admin")
 async def make_admin(
     user_id: str,
-    admin_service: Any = Depends(),
+    admin_service: AdminService = Depends(get_admin_service),
     current_user: User = Depends(require_admin)
 ):
     """Make a user admin"""
@@ -189,12 +211,12 @@ async def make_admin(
             "admin", 
             current_user["id"]
         )
-        await admin_service.log_system_event(
+        admin_service.log_system_event(
             "INFO", 
             f"User {user_id} made admin by {current_user['email']}", 
             "admin"
         )
         return {"success": True, "message": "User granted admin privileges"}
     except Exception as e:
-        await admin_service.log_system_event("ERROR", f"Make admin error: {str(e)}", "admin")
+        admin_service.log_system_event("ERROR", f"Make admin error: {str(e)}", "admin")
         raise HTTPException(status_code=500, detail="Failed to grant admin privileges")
\ No newline at end of file
@@ -0,0 +1,52 @@
+from fastapi import APIRouter, Body, Depends
+from fastapi.responses import StreamingResponse
+from typing import Annotated, Dict, Optional
+from models.agent import GitHubRequest
+from services.github_service import GitHubService
+from infrastructure.msgpack_route import MsgPackRoute
+from dependencies import get_current_user, get_github_service
+
+# Large file maps may be posted as MessagePack as well as JSON
+router = APIRouter(route_class=MsgPackRoute)
+
+@router.post("/create-repo")
+async def create_github_repo(
+    request: GitHubRequest,
+    user = Depends(get_current_user),
+    github_service: GitHubService = Depends(get_github_service)
+):
+    """Create GitHub repository"""
+    result = await github_service.create_repository(
+        request.project_name,
+        request.description,
+        request.private,
+        request.user_token
+    )
+
+    return result
+
+@router.post("/auto-commit")
+async def auto_commit_code(
+    repo_name: str,
+    files: Annotated[Dict[str, str], Body()],
+    message: str,
+    user_token: Optional[str] = None,
+    github_service: GitHubService = Depends(get_github_service)
+):
+    """Auto-commit code to GitHub"""
+    result = await github_service.auto_commit_code(repo_name, files, message, user_token)
+    return result
+
+@router.post("/export-codebase")
+async def export_full_codebase(
+    project_id: str,
+    project_files: Annotated[Dict[str, str], Body()],
+    github_service: GitHubService = Depends(get_github_service)
+):
+    """Export complete codebase as a streamed zip archive"""
+    files = await github_service.build_codebase_files(project_files)
+    return StreamingResponse(
+        github_service.iter_codebase_zip(files),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{project_id}.zip"'}
+    )
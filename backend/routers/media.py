@@ -0,0 +1,42 @@
+from fastapi import APIRouter, Depends, File, Form, UploadFile
+from typing import Optional
+from services.media_service import MediaService
+from dependencies import get_media_service
+
+router = APIRouter()
+
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+async def _iter_upload(file: UploadFile):
+    """Yield an uploaded file in fixed-size chunks"""
+    while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+        yield chunk
+
+@router.post("/upload-image")
+async def upload_image(
+    file: UploadFile = File(...),
+    project_id: Optional[str] = Form(None),
+    media_service: MediaService = Depends(get_media_service)
+):
+    """Upload and process images"""
+    result = await media_service.upload_image(_iter_upload(file), file.filename, project_id)
+    return result
+
+@router.post("/upload-file")
+async def upload_file(
+    file: UploadFile = File(...),
+    project_id: Optional[str] = Form(None),
+    media_service: MediaService = Depends(get_media_service)
+):
+    """Upload general files"""
+    result = await media_service.upload_file(_iter_upload(file), file.filename, project_id)
+    return result
+
+@router.get("/project/{project_id}")
+async def get_project_media(
+    project_id: str,
+    media_service: MediaService = Depends(get_media_service)
+):
+    """Get all media files for a project"""
+    result = await media_service.get_project_media(project_id)
+    return result
@@ -0,0 +1,40 @@
+from fastapi import APIRouter, Depends
+from models.agent import SupabaseRequest
+from services.supabase_service import SupabaseService
+from dependencies import get_supabase_service
+
+router = APIRouter()
+
+@router.post("/setup-database")
+async def setup_supabase_database(
+    request: SupabaseRequest,
+    supabase_service: SupabaseService = Depends(get_supabase_service)
+):
+    """Set up Supabase database tables"""
+    result = await supabase_service.setup_database_tables(
+        request.project_id,
+        request.schema or {}
+    )
+    return result
+
+@router.post("/setup-auth")
+async def setup_supabase_auth(
+    request: SupabaseRequest,
+    supabase_service: SupabaseService = Depends(get_supabase_service)
+):
+    """Set up Supabase authentication"""
+    result = await supabase_service.setup_authentication(
+        request.project_id,
+        request.auth_config or {}
+    )
+    return result
+
+@router.post("/chat-to-db")
+async def chat_to_database(
+    project_id: str,
+    query: str,
+    supabase_service: SupabaseService = Depends(get_supabase_service)
+):
+    """Convert natural language to database operations"""
+    result = await supabase_service.chat_to_database(project_id, query)
+    return result
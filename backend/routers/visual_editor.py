@@ -0,0 +1,36 @@
+import msgspec
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from models.agent import VisualEditPayload
+from services.visual_editor_service import VisualEditorService
+from dependencies import get_visual_editor_service
+
+router = APIRouter()
+
+_visual_edit_decoder = msgspec.json.Decoder(VisualEditPayload)
+
+@router.post("/apply")
+async def apply_visual_changes(
+    request: Request,
+    visual_editor_service: VisualEditorService = Depends(get_visual_editor_service)
+):
+    """Apply visual editor changes to code (body: VisualEditRequest)"""
+    try:
+        payload = _visual_edit_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    result = await visual_editor_service.apply_visual_changes_to_code(
+        payload.current_code,
+        msgspec.to_builtins(payload.operations)
+    )
+
+    return result
+
+@router.get("/metadata")
+async def get_visual_editor_metadata(
+    code: str,
+    visual_editor_service: VisualEditorService = Depends(get_visual_editor_service)
+):
+    """Get metadata for visual editor"""
+    result = await visual_editor_service.generate_visual_editor_metadata(code)
+    return result
@@ -1,28 +1,28 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
-from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
+from fastapi import FastAPI, APIRouter, BackgroundTasks, HTTPException, Depends, Query, Request, status
 from dotenv import load_dotenv
-from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from fastapi.responses import ORJSONResponse, Response, StreamingResponse
+from brotli_asgi import BrotliMiddleware
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field
 from typing import List, Optional, Dict, Any
 import uuid
-from datetime import datetime, timedelta
 import asyncio
+import msgspec
+import orjson
+from contextlib import asynccontextmanager
 
 # Import models
-from models.user import User, UserCreate, UserLogin, UserResponse, Token, UserUpdate
-from models.template import Template, TemplateCreate, TemplateResponse
+from models.user import UserCreate, UserLogin, UserResponse, Token, UserUpdate
+from models.template import TemplateCreate, TemplateResponse
 from models.project_extended import Project, ProjectCreate, ProjectUpdate, ProjectResponse, DeploymentRequest
-from models.project import ChatMessage, GenerateCodeRequest
-from models.admin import DashboardData, UserManagement, ProjectManagement, SystemLog, PlatformSettings
-from models.agent import AgentRequest, AgentResponse, VisualOperation, VisualEditRequest, GitHubRequest, SupabaseRequest, MediaUploadResponse
+from models.project import ChatMessage, ChatMessageDoc, ChatMessageStruct, GenerateCodeRequest
+from models.common import utc_now
 
 # Import services
-from services.auth_service import AuthService
-from services.project_service import ProjectService
+from services.auth_service import AuthService, SESSION_CACHE_TTL
+from services.project_service import ProjectService, PUBLIC_PROJECTS_SORT, USER_PROJECTS_SORT
 from services.template_service import TemplateService
 from services.deployment_service import DeploymentService
 from services.enhanced_ai_service import EnhancedAIService
@@ -35,21 +35,45 @@ from services.media_service import MediaService
 from services.chat_mode_agent_service import ChatModeAgentService
 from services.realtime_visual_service import RealtimeVisualService
 
+from dependencies import get_current_user, require_auth
+from routers import admin as admin_routes
+from routers import agent as agent_routes
+from routers import github as github_routes
+from routers import media as media_routes
+from routers import supabase as supabase_routes
+from routers import visual_editor as visual_editor_routes
+from infrastructure.cache import ResultCache, cache_key, cached_json_response, create_shared_cache
+from infrastructure.conditional import etag_matches, weak_etag
+from infrastructure.cors import AllowlistCORSMiddleware, load_allowed_origins
+from infrastructure.errors import UnhandledErrorMiddleware
+from infrastructure.health import HealthCheckMiddleware
+from infrastructure.indexes import ensure_indexes
+from infrastructure.jobs import JobRegistry
+from infrastructure.single_flight import SingleFlight
+from infrastructure.mongo_pool import NO_ID_PROJECTION, get_mongo, get_db, close_mongo
+from infrastructure.pagination import next_cursor
+from infrastructure.write_buffer import WriteBuffer
+
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
-# MongoDB connection
-mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
-db = client[os.environ['DB_NAME']]
+# Configure logging
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# MongoDB connection (one pooled client shared by every service)
+client = get_mongo()
+db = get_db()
 
 # Initialize Services
-auth_service = AuthService(db)
+auth_service = AuthService(db, create_shared_cache(maxsize=10000, ttl=SESSION_CACHE_TTL))
 project_service = ProjectService(db)
 template_service = TemplateService(db)
 deployment_service = DeploymentService(db)
 ai_service = EnhancedAIService()
-admin_service = AdminService(db)
 agent_service = AgentService()
 supabase_service = SupabaseService()
 github_service = GitHubService()
@@ -58,36 +82,85 @@ media_service = MediaService()
 chat_agent_service = ChatModeAgentService()
 realtime_visual_service = RealtimeVisualService()
 
-# Security
-security = HTTPBearer(auto_error=False)
+# Exact-match cache for expensive agent results
+agent_result_cache = ResultCache(maxsize=1024, ttl=3600)
+
+# Pre-serialized JSON for read-heavy template and public project listings
+listing_cache = create_shared_cache(maxsize=256, ttl=60)
+
+# Admin dashboard and analytics tolerate minute-level staleness
+admin_response_cache = create_shared_cache(maxsize=64, ttl=60)
+
+# Templates change only on create/use (which invalidate), so they live longer
+TEMPLATE_LIST_TTL = 300
+TEMPLATE_CATEGORIES_TTL = 3600
+
+# Agent and code generations are recorded in batches off the request path
+generation_buffer = WriteBuffer(db.agent_generations, max_batch=50, flush_interval=0.25)
+code_generation_buffer = WriteBuffer(db.code_generations, max_batch=100, flush_interval=0.2)
+
+# Chat messages are acknowledged once queued and written within ~50ms
+chat_message_buffer = WriteBuffer(db.chat_messages, max_batch=500, flush_interval=0.05)
+
+# In-flight code generations, keyed by prompt and context
+generation_flights = SingleFlight()
+
+# Background code generations, polled or streamed by job id
+generation_jobs = JobRegistry(maxsize=1024, ttl=3600)
+SSE_KEEPALIVE_SECONDS = 15
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Wire shared services onto app.state, prepare the database, and clean up on exit"""
+    app.state.mongo = client
+    app.state.auth_service = auth_service
+    app.state.project_service = project_service
+    app.state.admin_service = AdminService(db, admin_response_cache)
+    app.state.admin_service.start_analytics_rollups()
+    app.state.admin_service.start_system_sampler()
+    app.state.admin_response_cache = admin_response_cache
+    app.state.agent_service = agent_service
+    app.state.agent_result_cache = agent_result_cache
+    app.state.generation_buffer = generation_buffer
+    app.state.visual_editor_service = visual_editor_service
+    app.state.github_service = github_service
+    app.state.supabase_service = supabase_service
+    app.state.media_service = media_service
+    try:
+        # Index creation and seeding are independent, so run them together
+        await asyncio.gather(
+            ensure_indexes(db),
+            template_service.seed_default_templates()
+        )
+        logger.info("Database initialized successfully")
+    except Exception:
+        logger.exception("Database initialization error")
 
-async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
-    """Get current user from token"""
-    if not credentials:
-        return None
-    
-    try:
-        payload = auth_service.decode_token(credentials.credentials)
-        user_id = payload.get("sub")
-        if not user_id:
-            return None
-        
-        user = await auth_service.get_user_by_id(user_id)
-        return user
-    except:
-        return None
+    yield
 
-async def require_auth(user = Depends(get_current_user)):
-    """Require authentication"""
-    if not user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required"
-        )
-    return user
+    await app.state.admin_service.close()
+    await generation_buffer.stop()
+    await code_generation_buffer.stop()
+    await chat_message_buffer.stop()
+    await listing_cache.close()
+    await admin_response_cache.close()
+    await auth_service.session_cache.close()
+    media_service.close()
+    close_mongo()
 
 # Create the main app
-app = FastAPI(title="Lovable Clone API", version="1.0.0")
+app = FastAPI(
+    title="Lovable Clone API",
+    version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
+)
+
+async def cached_json(
+    key: str, build, headers_for=None, ttl: Optional[int] = None, if_none_match: Optional[str] = None
+) -> Response:
+    """Serve a listing from the shared listing cache"""
+    return await cached_json_response(listing_cache, key, build, headers_for, ttl, if_none_match)
 
 # Create routers
 api_router = APIRouter(prefix="/api")
@@ -96,42 +169,45 @@ projects_router = APIRouter(prefix="/projects", tags=["Projects"])
 templates_router = APIRouter(prefix="/templates", tags=["Templates"])
 ai_router = APIRouter(prefix="/ai", tags=["AI"])
 deploy_router = APIRouter(prefix="/deploy", tags=["Deployment"])
-admin_router = APIRouter(prefix="/admin", tags=["Admin"])
 
 # =============================================================================
 # AUTHENTICATION ROUTES
 # =============================================================================
 
+def _user_response(user: Dict[str, Any]) -> Dict[str, Any]:
+    """Public view of a stored user, shaped like UserResponse"""
+    return {
+        "id": user["id"],
+        "email": user["email"],
+        "name": user["name"],
+        "username": user.get("username"),
+        "bio": user.get("bio"),
+        "avatar": user.get("avatar"),
+        "is_premium": user.get("is_premium", False),
+        "projects_count": user.get("projects_count", 0),
+        "followers_count": user.get("followers_count", 0),
+        "following_count": user.get("following_count", 0)
+    }
+
+async def _token_response(user: Dict[str, Any]) -> ORJSONResponse:
+    """Issue an access token for a user, shaped like Token"""
+    access_token = await auth_service.issue_access_token(user)
+    return ORJSONResponse({
+        "access_token": access_token,
+        "token_type": "bearer",
+        "user": _user_response(user)
+    })
+
+# Responses are built as plain dicts and returned as ORJSONResponse;
+# response_model stays only to document the schema.
+
 @auth_router.post("/register", response_model=Token)
 async def register(user_data: UserCreate):
     """Register a new user"""
     try:
-        user_dict = user_data.dict()
+        user_dict = user_data.model_dump()
         user = await auth_service.create_user(user_dict)
-        
-        # Create access token
-        access_token = auth_service.create_access_token(
-            data={"sub": user["id"]}
-        )
-        
-        user_response = UserResponse(
-            id=user["id"],
-            email=user["email"],
-            name=user["name"],
-            username=user.get("username"),
-            bio=user.get("bio"),
-            avatar=user.get("avatar"),
-            is_premium=user.get("is_premium", False),
-            projects_count=0,
-            followers_count=0,
-            following_count=0
-        )
-        
-        return Token(
-            access_token=access_token,
-            token_type="bearer",
-            user=user_response
-        )
+        return await _token_response(user)
     except HTTPException as e:
         raise e
     except Exception as e:
@@ -148,89 +224,93 @@ async def login(login_data: UserLogin):
             detail="Incorrect email or password"
         )
     
-    access_token = auth_service.create_access_token(
-        data={"sub": user["id"]}
-    )
-    
-    user_response = UserResponse(
-        id=user["id"],
-        email=user["email"],
-        name=user["name"],
-        username=user.get("username"),
-        bio=user.get("bio"),
-        avatar=user.get("avatar"),
-        is_premium=user.get("is_premium", False),
-        projects_count=user.get("projects_count", 0),
-        followers_count=user.get("followers_count", 0),
-        following_count=user.get("following_count", 0)
-    )
-    
-    return Token(
-        access_token=access_token,
-        token_type="bearer",
-        user=user_response
-    )
+    return await _token_response(user)
 
 @auth_router.get("/me", response_model=UserResponse)
 async def get_current_user_info(user = Depends(require_auth)):
     """Get current user information"""
-    return UserResponse(
-        id=user["id"],
-        email=user["email"],
-        name=user["name"],
-        username=user.get("username"),
-        bio=user.get("bio"),
-        avatar=user.get("avatar"),
-        is_premium=user.get("is_premium", False),
-        projects_count=user.get("projects_count", 0),
-        followers_count=user.get("followers_count", 0),
-        following_count=user.get("following_count", 0)
-    )
+    return ORJSONResponse(_user_response(user))
 
 # =============================================================================
 # PROJECT ROUTES
 # =============================================================================
 
-@projects_router.post("/", response_model=Project)
+def _cursor_headers(page: List[Dict[str, Any]], sort, limit: int) -> Dict[str, str]:
+    """X-Next-Cursor header for a listing page, if another page may follow"""
+    cursor = next_cursor(page, sort, limit)
+    return {"X-Next-Cursor": cursor} if cursor else {}
+
+@projects_router.post("/")
 async def create_project(project_data: ProjectCreate, user = Depends(require_auth)):
     """Create a new project"""
-    return await project_service.create_project(project_data.dict(), user["id"])
+    return await project_service.create_project(project_data.model_dump(), user["id"])
 
-@projects_router.get("/", response_model=List[Project])
+@projects_router.get("/")
 async def get_projects(
     public: bool = False, 
     skip: int = 0, 
     limit: int = 20,
+    cursor: Optional[str] = None,
     user = Depends(get_current_user)
 ):
-    """Get projects (public or user's projects)"""
+    """Get projects (public or user's projects)
+
+    Pass the X-Next-Cursor header of one page as `cursor` to fetch the next;
+    `skip` is kept for older clients and ignored when a cursor is given.
+    """
+    # Stored documents are trusted: built with model_construct, so nested
+    # versions/collaborators stay plain dicts when dumped
     if public or not user:
-        return await project_service.get_public_projects(skip, limit)
-    else:
-        return await project_service.get_user_projects(user["id"], skip, limit)
+        async def build():
+            projects = await project_service.get_public_projects(skip, limit, cursor)
+            return [project.model_dump(warnings=False) for project in projects]
+        return await cached_json(
+            cache_key("public-projects", skip, limit, cursor),
+            build,
+            lambda page: _cursor_headers(page, PUBLIC_PROJECTS_SORT, limit)
+        )
+
+    projects = await project_service.get_user_projects(user["id"], skip, limit, cursor)
+    page = [project.model_dump(warnings=False) for project in projects]
+    return ORJSONResponse(page, headers=_cursor_headers(page, USER_PROJECTS_SORT, limit))
 
-@projects_router.get("/{project_id}", response_model=Project)
-async def get_project(project_id: str, user = Depends(get_current_user)):
-    """Get a specific project"""
+@projects_router.get("/{project_id}")
+async def get_project(project_id: str, request: Request, user = Depends(get_current_user)):
+    """Get a specific project; answers 304 when the client's ETag is current"""
     user_id = user["id"] if user else None
-    return await project_service.get_project_by_id(project_id, user_id)
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        updated_at = await project_service.get_project_updated_at(project_id, user_id)
+        etag = weak_etag(project_id, updated_at)
+        if etag_matches(if_none_match, etag):
+            await project_service.record_view(project_id)
+            return Response(status_code=304, headers={"ETag": etag})
+
+    project = await project_service.get_project_by_id(project_id, user_id)
+    return ORJSONResponse(
+        project.model_dump(),
+        headers={"ETag": weak_etag(project.id, project.updated_at)}
+    )
 
-@projects_router.put("/{project_id}", response_model=Project)
+@projects_router.put("/{project_id}")
 async def update_project(
     project_id: str, 
     update_data: ProjectUpdate, 
     user = Depends(require_auth)
 ):
     """Update a project"""
-    return await project_service.update_project(project_id, update_data.dict(exclude_unset=True), user["id"])
+    project = await project_service.update_project(project_id, update_data.model_dump(exclude_unset=True), user["id"])
+    await listing_cache.delete_prefix("public-projects:")
+    return project
 
 @projects_router.delete("/{project_id}")
 async def delete_project(project_id: str, user = Depends(require_auth)):
     """Delete a project"""
     await project_service.delete_project(project_id, user["id"])
+    await listing_cache.delete_prefix("public-projects:")
     return {"success": True, "message": "Project deleted successfully"}
 
-@projects_router.post("/{project_id}/fork", response_model=Project)
+@projects_router.post("/{project_id}/fork")
 async def fork_project(
     project_id: str, 
     fork_name: Optional[str] = None, 
@@ -254,77 +334,182 @@ async def add_collaborator(
 # TEMPLATE ROUTES
 # =============================================================================
 
-@templates_router.get("/", response_model=List[Template])
-async def get_templates(category: str = None, skip: int = 0, limit: int = 20):
+@templates_router.get("/")
+async def get_templates(request: Request, category: str = None, skip: int = 0, limit: int = 20):
     """Get templates"""
-    return await template_service.get_templates(category, skip, limit)
+    async def build():
+        templates = await template_service.get_templates(category, skip, limit)
+        return [template.model_dump() for template in templates]
+    return await cached_json(
+        cache_key("templates:list", category, skip, limit),
+        build,
+        ttl=TEMPLATE_LIST_TTL,
+        if_none_match=request.headers.get("if-none-match")
+    )
 
-@templates_router.get("/featured", response_model=List[Template])
+@templates_router.get("/featured")
 async def get_featured_templates(limit: int = 10):
     """Get featured templates"""
-    return await template_service.get_featured_templates(limit)
+    async def build():
+        templates = await template_service.get_featured_templates(limit)
+        return [template.model_dump() for template in templates]
+    return await cached_json(cache_key("templates:featured", limit), build, ttl=TEMPLATE_LIST_TTL)
 
 @templates_router.get("/categories")
 async def get_template_categories():
     """Get template categories"""
-    return await template_service.get_categories()
+    return await cached_json("templates:categories", template_service.get_categories, ttl=TEMPLATE_CATEGORIES_TTL)
 
-@templates_router.get("/search", response_model=List[Template])
+@templates_router.get("/search")
 async def search_templates(q: str, skip: int = 0, limit: int = 20):
     """Search templates"""
-    return await template_service.search_templates(q, skip, limit)
-
-@templates_router.get("/{template_id}", response_model=Template)
-async def get_template(template_id: str):
-    """Get specific template"""
-    return await template_service.get_template_by_id(template_id)
+    async def build():
+        templates = await template_service.search_templates(q, skip, limit)
+        return [template.model_dump() for template in templates]
+    return await cached_json(cache_key("templates:search", q, skip, limit), build, ttl=TEMPLATE_LIST_TTL)
+
+@templates_router.get("/{template_id}")
+async def get_template(template_id: str, request: Request):
+    """Get specific template; answers 304 when the client's ETag is current"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match:
+        etag = weak_etag(template_id, await template_service.get_template_updated_at(template_id))
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=304, headers={"ETag": etag})
+
+    template = await template_service.get_template_by_id(template_id)
+    return ORJSONResponse(
+        template.model_dump(),
+        headers={"ETag": weak_etag(template.id, template.updated_at)}
+    )
 
-@templates_router.post("/{template_id}/use", response_model=Template)
+@templates_router.post("/{template_id}/use")
 async def use_template(template_id: str):
     """Mark template as used"""
-    return await template_service.use_template(template_id)
+    template = await template_service.use_template(template_id)
+    await listing_cache.delete_prefix("templates:")
+    return template
 
-@templates_router.post("/", response_model=Template)
+@templates_router.post("/")
 async def create_template(template_data: TemplateCreate, user = Depends(require_auth)):
     """Create a new template"""
-    return await template_service.create_template(template_data, user["id"])
+    template = await template_service.create_template(template_data, user["id"])
+    await listing_cache.delete_prefix("templates:")
+    return template
 
 # =============================================================================
 # AI ROUTES
 # =============================================================================
 
+async def _generate_and_record(request: GenerateCodeRequest) -> Dict[str, Any]:
+    """Run one code generation and queue its record for the database"""
+    context = getattr(request, 'context', None)
+    # Identical prompts arriving together share a single LLM call
+    result = await generation_flights.do(
+        cache_key("generate-code", request.prompt, context),
+        lambda: ai_service.generate_code(request.prompt, request.session_id, context=context)
+    )
+    
+    # Save generation to database
+    generation_record = {
+        "session_id": request.session_id,
+        "prompt": request.prompt,
+        "generated_code": result["code"],
+        "metadata": result["metadata"],
+        "created_at": utc_now()
+    }
+    
+    code_generation_buffer.put(generation_record)
+    
+    return {
+        "success": True,
+        "code": result["code"],
+        "metadata": result["metadata"],
+        "message": "Code generated successfully"
+    }
+
 @ai_router.post("/generate-code")
 async def generate_code(request: GenerateCodeRequest):
     """Generate code using AI"""
     try:
-        result = await ai_service.generate_code(
-            request.prompt, 
-            request.session_id,
-            context=getattr(request, 'context', None)
-        )
-        
-        # Save generation to database
-        generation_record = {
-            "session_id": request.session_id,
-            "prompt": request.prompt,
-            "generated_code": result["code"],
-            "metadata": result["metadata"],
-            "created_at": datetime.utcnow()
-        }
-        
-        await db.code_generations.insert_one(generation_record)
-        
-        return {
-            "success": True,
-            "code": result["code"],
-            "metadata": result["metadata"],
-            "message": "Code generated successfully"
-        }
-        
-    except Exception as e:
-        logging.error(f"Error generating code: {e}")
+        return await _generate_and_record(request)
+    except Exception:
+        logger.exception("Error generating code")
         raise HTTPException(status_code=500, detail="Failed to generate code")
 
+def _sse_event(event: str, data: Any) -> bytes:
+    """Encode one server-sent event"""
+    return b"event: " + event.encode() + b"\ndata: " + orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS) + b"\n\n"
+
+@ai_router.post("/generate-code/stream")
+async def stream_generate_code(request: GenerateCodeRequest):
+    """Generate code using AI, streaming an event as each generation phase completes
+    and code_delta events with the code while it is being written"""
+    context = getattr(request, 'context', None)
+
+    async def events():
+        async for event in ai_service.stream_generate_code(request.prompt, request.session_id, context=context):
+            if event["phase"] != "complete":
+                yield _sse_event(event["phase"], event)
+                continue
+
+            result = event["result"]
+            if result["success"]:
+                code_generation_buffer.put({
+                    "session_id": request.session_id,
+                    "prompt": request.prompt,
+                    "generated_code": result["code"],
+                    "metadata": result["metadata"],
+                    "created_at": utc_now()
+                })
+            yield _sse_event("complete", result)
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@ai_router.post("/generate-code/jobs")
+async def submit_generate_code(request: GenerateCodeRequest, background_tasks: BackgroundTasks):
+    """Start a code generation in the background and return its job id"""
+    job = generation_jobs.create()
+    background_tasks.add_task(generation_jobs.run, job, _generate_and_record, request)
+    return {"success": True, "job_id": job.id, "status": job.status}
+
+def _get_generation_job(job_id: str):
+    """Look up a generation job or 404"""
+    job = generation_jobs.get(job_id)
+    if not job:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+@ai_router.get("/generate-code/jobs/{job_id}")
+async def get_generate_code_job(job_id: str):
+    """Get the status, and once finished the result, of a generation job"""
+    return _get_generation_job(job_id).snapshot()
+
+@ai_router.get("/generate-code/jobs/{job_id}/stream")
+async def stream_generate_code_job(job_id: str):
+    """Server-sent events for a generation job: its status now, then its outcome"""
+    job = _get_generation_job(job_id)
+
+    async def events():
+        yield _sse_event("status", {"status": job.status})
+        while not job.done.is_set():
+            try:
+                await asyncio.wait_for(job.done.wait(), timeout=SSE_KEEPALIVE_SECONDS)
+            except asyncio.TimeoutError:
+                # Comment line keeps proxies from closing an idle stream
+                yield b": keepalive\n\n"
+        yield _sse_event(job.status, job.snapshot())
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 @ai_router.post("/improve-code")
 async def improve_code(code: str, session_id: str):
     """Get AI suggestions for code improvement"""
@@ -334,8 +519,8 @@ async def improve_code(code: str, session_id: str):
             "success": True,
             "suggestions": suggestions
         }
-    except Exception as e:
-        logging.error(f"Error generating improvements: {e}")
+    except Exception:
+        logger.exception("Error generating improvements")
         raise HTTPException(status_code=500, detail="Failed to generate improvements")
 
 @ai_router.post("/generate-tests")
@@ -347,8 +532,8 @@ async def generate_tests(code: str, session_id: str):
             "success": True,
             "tests": tests
         }
-    except Exception as e:
-        logging.error(f"Error generating tests: {e}")
+    except Exception:
+        logger.exception("Error generating tests")
         raise HTTPException(status_code=500, detail="Failed to generate tests")
 
 # =============================================================================
@@ -380,235 +565,75 @@ async def undeploy_project(project_id: str, user = Depends(require_auth)):
 # =============================================================================
 
 @api_router.get("/chat/{session_id}")
-async def get_chat_history(session_id: str):
-    """Get chat history for a session"""
+async def get_chat_history(session_id: str, request: Request, limit: int = Query(100, ge=1, le=1000)):
+    """Get chat history for a session, streamed as JSON (or NDJSON when requested via Accept)"""
+    cursor = db.chat_messages.find(
+        {"session_id": session_id},
+        projection=NO_ID_PROJECTION
+    ).sort("timestamp", 1).limit(limit).batch_size(limit)
+    
+    # Run the query before any response bytes go out, so a failure is still a 500;
+    # with batch_size == limit this first batch is the whole page
     try:
-        messages = await db.chat_messages.find(
-            {"session_id": session_id}
-        ).sort("timestamp", 1).to_list(100)
-        
-        # Remove MongoDB ObjectId from messages
-        for message in messages:
-            message.pop("_id", None)
-        
-        return {
-            "success": True,
-            "messages": messages
-        }
-    except Exception as e:
-        logging.error(f"Error fetching chat history: {e}")
+        await cursor.fetch_next
+    except Exception:
+        logger.exception("Error fetching chat history")
         raise HTTPException(status_code=500, detail="Failed to fetch chat history")
+    
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        async def stream_messages():
+            try:
+                async for message in cursor:
+                    yield orjson.dumps(message) + b"\n"
+            except Exception:
+                logger.exception("Chat history stream failed")
+        return StreamingResponse(stream_messages(), media_type="application/x-ndjson")
+    
+    # Same {"success", "messages"} body, written out from the fetched batch
+    async def stream_envelope():
+        yield b'{"success":true,"messages":['
+        separator = b""
+        try:
+            async for message in cursor:
+                yield separator + orjson.dumps(message)
+                separator = b","
+        except Exception:
+            # Headers are gone; leave the body unterminated so clients see it is incomplete
+            logger.exception("Chat history stream failed")
+            return
+        yield b"]}"
+    return StreamingResponse(stream_envelope(), media_type="application/json")
+
+_chat_message_decoder = msgspec.json.Decoder(ChatMessageStruct)
 
 @api_router.post("/chat/{session_id}")
-async def add_chat_message(session_id: str, message: ChatMessage):
-    """Add a new chat message"""
+async def add_chat_message(session_id: str, request: Request):
+    """Add a new chat message (body: ChatMessage)"""
     try:
-        message_data = {
-            "session_id": session_id,
-            **message.dict(),
-            "timestamp": datetime.utcnow()
-        }
-        
-        result = await db.chat_messages.insert_one(message_data)
-        
-        # Remove ObjectId for response
-        message_data.pop("_id", None)
-        
-        return {
-            "success": True,
-            "message": message_data
-        }
-        
-    except Exception as e:
-        logging.error(f"Error processing chat message: {e}")
-        raise HTTPException(status_code=500, detail="Failed to process chat message")
-
-# =============================================================================
-# LEGACY ROUTES
-# =============================================================================
+        message = _chat_message_decoder.decode(await request.body())
+    except msgspec.DecodeError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
 
-@api_router.get("/")
-async def root():
-    return {"message": "Lovable Clone API v1.0.0", "status": "online"}
-
-# =============================================================================
-# AGENT MODE ROUTES (AI Autonomous)
-# =============================================================================
-
-@ai_router.post("/agent-generate")
-async def agent_generate_code(request: AgentRequest):
-    """Generate code using autonomous AI agent with 91% error reduction"""
     try:
-        result = await agent_service.autonomous_code_generation(
-            request.prompt, 
-            request.session_id,
-            request.context
+        message_doc = ChatMessageDoc(
+            session_id=session_id,
+            type=message.type,
+            content=message.content,
+            timestamp=utc_now()
         )
         
-        if result["success"]:
-            # Save generation to database
-            generation_record = {
-                "session_id": request.session_id,
-                "prompt": request.prompt,
-                "generated_code": result["code"],
-                "confidence_score": result["confidence_score"],
-                "plan": result["plan"],
-                "created_at": datetime.utcnow()
-            }
-            
-            await db.agent_generations.insert_one(generation_record)
-        
-        return result
-        
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Agent code generation failed"
-        }
-
-@ai_router.post("/codebase-search")
-async def codebase_search(query: str, project_id: str):
-    """Intelligent codebase search"""
-    try:
-        # Get project files - would fetch from project in real implementation
-        project_files = []
-        
-        results = await agent_service.codebase_search(query, project_files)
+        # insert_many stamps _id onto what it writes, so the buffer and the
+        # response each get their own dict
+        chat_message_buffer.put(msgspec.structs.asdict(message_doc))
         
         return {
             "success": True,
-            "results": results,
-            "query": query
+            "message": msgspec.structs.asdict(message_doc)
         }
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Codebase search failed"
-        }
-
-# =============================================================================
-# VISUAL EDITOR ROUTES
-# =============================================================================
-
-@api_router.post("/visual-editor/apply")
-async def apply_visual_changes(request: VisualEditRequest):
-    """Apply visual editor changes to code"""
-    try:
-        result = await visual_editor_service.apply_visual_changes_to_code(
-            request.current_code,
-            [op.dict() for op in request.operations]
-        )
-        
-        return result
         
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to apply visual changes"
-        }
-
-@api_router.get("/visual-editor/metadata")
-async def get_visual_editor_metadata(code: str):
-    """Get metadata for visual editor"""
-    try:
-        result = await visual_editor_service.generate_visual_editor_metadata(code)
-        return result
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to generate visual editor metadata"
-        }
-
-# =============================================================================
-# GITHUB INTEGRATION ROUTES
-# =============================================================================
-
-@api_router.post("/github/create-repo")
-async def create_github_repo(request: GitHubRequest, user = Depends(get_current_user)):
-    """Create GitHub repository"""
-    try:
-        result = await github_service.create_repository(
-            request.project_name,
-            request.description,
-            request.private,
-            request.user_token
-        )
-        
-        return result
-        
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to create GitHub repository"
-        }
-
-@api_router.post("/github/auto-commit")
-async def auto_commit_code(repo_name: str, files: Dict[str, str], message: str, user_token: Optional[str] = None):
-    """Auto-commit code to GitHub"""
-    try:
-        result = await github_service.auto_commit_code(repo_name, files, message, user_token)
-        return result
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to commit code"
-        }
-
-# =============================================================================
-# SUPABASE INTEGRATION ROUTES  
-# =============================================================================
-
-@api_router.post("/supabase/setup-database")
-async def setup_supabase_database(request: SupabaseRequest):
-    """Set up Supabase database tables"""
-    try:
-        result = await supabase_service.setup_database_tables(
-            request.project_id,
-            request.schema or {}
-        )
-        return result
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to setup database"
-        }
-
-@api_router.post("/supabase/chat-to-db")
-async def chat_to_database(project_id: str, query: str):
-    """Convert natural language to database operations"""
-    try:
-        result = await supabase_service.chat_to_database(project_id, query)
-        return result
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to process database chat"
-        }
-
-# =============================================================================
-# MEDIA & FILE UPLOAD ROUTES
-# =============================================================================
-
-@api_router.post("/media/upload-image")
-async def upload_image(file_data: bytes, filename: str, project_id: Optional[str] = None):
-    """Upload and process images"""
-    try:
-        result = await media_service.upload_image(file_data, filename, project_id)
-        return result
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to upload image"
-        }
+    except Exception:
+        logger.exception("Error processing chat message")
+        raise HTTPException(status_code=500, detail="Failed to process chat message")
 
 # =============================================================================
 # CHAT MODE AGENT ROUTES (Helper Agent - No Code Editing)
@@ -617,36 +642,22 @@ async def upload_image(file_data: bytes, filename: str, project_id: Optional[str
 @api_router.post("/chat-agent/query")
 async def chat_agent_query(query: str, context: Dict[str, Any] = None, session_id: str = "default"):
     """Process query with Chat Mode Agent (helper, doesn't edit code)"""
-    try:
-        result = await chat_agent_service.process_query(
-            query, 
-            context or {}, 
-            session_id
-        )
-        return result
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to process chat agent query"
-        }
+    result = await chat_agent_service.process_query(
+        query, 
+        context or {}, 
+        session_id
+    )
+    return result
 
 @api_router.post("/chat-agent/multi-step-reasoning")
 async def chat_agent_reasoning(problem: str, context: Dict[str, Any] = None, session_id: str = "default"):
     """Multi-step reasoning for complex problems"""
-    try:
-        result = await chat_agent_service.multi_step_reasoning(
-            problem,
-            context or {},
-            session_id
-        )
-        return result
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to process reasoning request"
-        }
+    result = await chat_agent_service.multi_step_reasoning(
+        problem,
+        context or {},
+        session_id
+    )
+    return result
 
 # =============================================================================
 # REAL-TIME VISUAL EDITOR ROUTES (HMR-like)
@@ -655,41 +666,20 @@ async def chat_agent_reasoning(problem: str, context: Dict[str, Any] = None, ses
 @api_router.post("/realtime-visual/start-session")
 async def start_visual_session(session_id: str, initial_code: str):
     """Start real-time visual editing session"""
-    try:
-        result = await realtime_visual_service.start_visual_session(session_id, initial_code)
-        return result
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to start visual session"
-        }
+    result = await realtime_visual_service.start_visual_session(session_id, initial_code)
+    return result
 
 @api_router.post("/realtime-visual/apply-change")
 async def apply_realtime_change(session_id: str, change: Dict[str, Any]):
     """Apply real-time visual change with immediate feedback"""
-    try:
-        result = await realtime_visual_service.apply_realtime_change(session_id, change)
-        return result
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to apply real-time change"
-        }
+    result = await realtime_visual_service.apply_realtime_change(session_id, change)
+    return result
 
 @api_router.get("/realtime-visual/session/{session_id}")
 async def get_visual_session_info(session_id: str):
     """Get real-time visual session information"""
-    try:
-        result = await realtime_visual_service.get_session_info(session_id)
-        return result
-    except Exception as e:
-        return {
-            "success": False,
-            "error": str(e),
-            "message": "Failed to get session info"
-        }
+    result = await realtime_visual_service.get_session_info(session_id)
+    return result
 
 # Include all routers
 api_router.include_router(auth_router)
@@ -697,194 +687,47 @@ api_router.include_router(projects_router)
 api_router.include_router(templates_router)
 api_router.include_router(ai_router)
 api_router.include_router(deploy_router)
+api_router.include_router(agent_routes.router, prefix="/ai", tags=["AI"])
+api_router.include_router(visual_editor_routes.router, prefix="/visual-editor", tags=["Visual Editor"])
+api_router.include_router(github_routes.router, prefix="/github", tags=["GitHub"])
+api_router.include_router(supabase_routes.router, prefix="/supabase", tags=["Supabase"])
+api_router.include_router(media_routes.router, prefix="/media", tags=["Media"])
+api_router.include_router(admin_routes.router, prefix="/admin", tags=["Admin"])
 
-# Create admin router with dependencies
-admin_router_with_deps = APIRouter(prefix="/admin", tags=["Admin"])
-
-# Override dependencies for admin routes
-def get_admin_service():
-    return admin_service
-
-def get_current_user_for_admin(credentials = Depends(security)):
-    return get_current_user(credentials)
-
-async def require_admin_access(current_user = Depends(get_current_user), admin_svc = Depends(get_admin_service)):
-    """Require admin privileges"""
-    if not current_user:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Authentication required"
-        )
-    
-    is_admin = await admin_svc.is_admin(current_user["id"])
-    if not is_admin:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail="Admin privileges required"
-        )
-    
-    return current_user
-
-# Add admin routes with proper dependencies
-@admin_router_with_deps.get("/dashboard", response_model=DashboardData)
-async def admin_dashboard(current_user = Depends(require_admin_access), admin_svc = Depends(get_admin_service)):
-    """Get admin dashboard data"""
-    try:
-        dashboard_data = await admin_svc.get_dashboard_data()
-        await admin_svc.log_system_event(
-            "INFO", 
-            f"Admin dashboard accessed by {current_user['email']}", 
-            "admin", 
-            current_user["id"]
-        )
-        return dashboard_data
-    except Exception as e:
-        await admin_svc.log_system_event("ERROR", f"Dashboard error: {str(e)}", "admin")
-        raise HTTPException(status_code=500, detail="Failed to load dashboard")
-
-@admin_router_with_deps.get("/users", response_model=List[UserManagement])
-async def admin_get_users(skip: int = 0, limit: int = 50, current_user = Depends(require_admin_access), admin_svc = Depends(get_admin_service)):
-    """Get users for management"""
-    try:
-        users = await admin_svc.get_users_management(skip, limit)
-        return users
-    except Exception as e:
-        await admin_svc.log_system_event("ERROR", f"Users management error: {str(e)}", "admin")
-        raise HTTPException(status_code=500, detail="Failed to load users")
-
-@admin_router_with_deps.put("/users/{user_id}/status")
-async def admin_update_user_status(user_id: str, is_active: bool, current_user = Depends(require_admin_access), admin_svc = Depends(get_admin_service)):
-    """Update user active status"""
-    try:
-        success = await admin_svc.update_user_status(user_id, is_active)
-        if success:
-            action = "activated" if is_active else "deactivated"
-            await admin_svc.log_system_event(
-                "INFO", 
-                f"User {user_id} {action} by admin {current_user['email']}", 
-                "admin"
-            )
-            return {"success": True, "message": f"User {action} successfully"}
-        else:
-            raise HTTPException(status_code=404, detail="User not found")
-    except Exception as e:
-        await admin_svc.log_system_event("ERROR", f"User status update error: {str(e)}", "admin")
-        raise HTTPException(status_code=500, detail="Failed to update user status")
-
-@admin_router_with_deps.get("/projects", response_model=List[ProjectManagement])
-async def admin_get_projects(skip: int = 0, limit: int = 50, current_user = Depends(require_admin_access), admin_svc = Depends(get_admin_service)):
-    """Get projects for management"""
-    try:
-        projects = await admin_svc.get_projects_management(skip, limit)
-        return projects
-    except Exception as e:
-        await admin_svc.log_system_event("ERROR", f"Projects management error: {str(e)}", "admin")
-        raise HTTPException(status_code=500, detail="Failed to load projects")
-
-@admin_router_with_deps.delete("/projects/{project_id}")
-async def admin_delete_project(project_id: str, current_user = Depends(require_admin_access), admin_svc = Depends(get_admin_service)):
-    """Delete a project"""
-    try:
-        success = await admin_svc.delete_project(project_id)
-        if success:
-            return {"success": True, "message": "Project deleted successfully"}
-        else:
-            raise HTTPException(status_code=404, detail="Project not found")
-    except Exception as e:
-        await admin_svc.log_system_event("ERROR", f"Project deletion error: {str(e)}", "admin")
-        raise HTTPException(status_code=500, detail="Failed to delete project")
-
-@admin_router_with_deps.get("/logs", response_model=List[SystemLog])
-async def admin_get_logs(level: Optional[str] = None, limit: int = 100, current_user = Depends(require_admin_access), admin_svc = Depends(get_admin_service)):
-    """Get system logs"""
-    try:
-        logs = await admin_svc.get_system_logs(level, limit)
-        return logs
-    except Exception as e:
-        await admin_svc.log_system_event("ERROR", f"Logs retrieval error: {str(e)}", "admin")
-        raise HTTPException(status_code=500, detail="Failed to load logs")
+app.include_router(api_router)
 
-@admin_router_with_deps.get("/settings", response_model=PlatformSettings)
-async def admin_get_settings(current_user = Depends(require_admin_access), admin_svc = Depends(get_admin_service)):
-    """Get platform settings"""
-    try:
-        settings = await admin_svc.get_platform_settings()
-        return settings
-    except Exception as e:
-        await admin_svc.log_system_event("ERROR", f"Settings retrieval error: {str(e)}", "admin")
-        raise HTTPException(status_code=500, detail="Failed to load settings")
+# Compress JSON-heavy responses (listings, chat history, logs) with Brotli,
+# falling back to gzip for clients without br; small bodies are sent as-is
+app.add_middleware(
+    BrotliMiddleware,
+    quality=4,
+    minimum_size=1000,
+    gzip_fallback=True,
+    # Server-sent event streams must reach the client unbuffered
+    excluded_handlers=[r"^/api/.*/stream$"]
+)
 
-@admin_router_with_deps.put("/settings")
-async def admin_update_settings(settings: PlatformSettings, current_user = Depends(require_admin_access), admin_svc = Depends(get_admin_service)):
-    """Update platform settings"""
-    try:
-        success = await admin_svc.update_platform_settings(settings)
-        if success:
-            return {"success": True, "message": "Settings updated successfully"}
-        else:
-            raise HTTPException(status_code=500, detail="Failed to update settings")
-    except Exception as e:
-        await admin_svc.log_system_event("ERROR", f"Settings update error: {str(e)}", "admin")
-        raise HTTPException(status_code=500, detail="Failed to update settings")
+# Load balancer polls of /api/ are answered here without touching the router
+app.add_middleware(HealthCheckMiddleware)
 
-@admin_router_with_deps.get("/analytics")
-async def admin_get_analytics(days: int = 30, current_user = Depends(require_admin_access), admin_svc = Depends(get_admin_service)):
-    """Get usage analytics"""
-    try:
-        analytics = await admin_svc.get_usage_analytics(days)
-        return analytics
-    except Exception as e:
-        await admin_svc.log_system_event("ERROR", f"Analytics error: {str(e)}", "admin")
-        raise HTTPException(status_code=500, detail="Failed to load analytics")
+# Uncaught errors become a logged, fixed-message 500 that still gets CORS headers
+app.add_middleware(UnhandledErrorMiddleware)
 
-@admin_router_with_deps.post("/users/{user_id}/make-admin")
-async def admin_make_admin(user_id: str, current_user = Depends(require_admin_access), admin_svc = Depends(get_admin_service)):
-    """Make a user admin"""
-    try:
-        admin_user = await admin_svc.create_admin_user(
-            user_id, 
-            "admin", 
-            current_user["id"]
-        )
-        await admin_svc.log_system_event(
-            "INFO", 
-            f"User {user_id} made admin by {current_user['email']}", 
-            "admin"
-        )
-        return {"success": True, "message": "User granted admin privileges"}
-    except Exception as e:
-        await admin_svc.log_system_event("ERROR", f"Make admin error: {str(e)}", "admin")
-        raise HTTPException(status_code=500, detail="Failed to grant admin privileges")
-
-api_router.include_router(admin_router_with_deps)
-
-app.include_router(api_router)
+CORS_ORIGINS = load_allowed_origins()
 
+# Added last so it is outermost: preflights are answered before compression or routing
 app.add_middleware(
-    CORSMiddleware,
+    AllowlistCORSMiddleware,
     allow_credentials=True,
-    allow_origins=["*"],
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+    allow_origins=CORS_ORIGINS,
+    allow_methods=["GET", "POST", "PUT", "DELETE"],
+    # If-None-Match / ETag let cross-origin clients revalidate projects and templates
+    allow_headers=["Authorization", "Content-Type", "Accept", "If-None-Match"],
+    expose_headers=["X-Next-Cursor", "ETag"],
+    # Let browsers reuse a preflight for a day
+    max_age=86400,
 )
-logger = logging.getLogger(__name__)
-
-@app.on_event("startup")
-async def startup_db():
-    """Initialize database with default data"""
-    try:
-        # Seed default templates
-        await template_service.seed_default_templates()
-        logger.info("Database initialized successfully")
-    except Exception as e:
-        logger.error(f"Database initialization error: {e}")
 
-@app.on_event("shutdown")
-async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("server:app", host="0.0.0.0", port=int(os.environ.get("PORT", 8001)), loop="uvloop", http="httptools")
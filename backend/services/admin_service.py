@@ -1,20 +1,83 @@
 import os
 import uuid
+import asyncio
+import logging
 import psutil
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from datetime import timedelta
+from cachetools import TTLCache
+from typing import List, Dict, Any, Optional, Set
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
+from infrastructure.write_buffer import WriteBuffer
+from models.common import new_id, utc_now
+from infrastructure.pagination import decode_cursor, keyset_filter
 from models.admin import (
     AdminUser, UserStats, ProjectStats, SystemStats, DashboardData,
     UserManagement, ProjectManagement, SystemLog, PlatformSettings
 )
 
+logger = logging.getLogger(__name__)
+
+# How far back the analytics rollup recomputes, and how often it runs
+ANALYTICS_WINDOW_DAYS = 365
+ANALYTICS_ROLLUP_INTERVAL = 300
+# Seconds between host CPU / memory / disk samples shown on the dashboard
+SYSTEM_SAMPLE_INTERVAL = 5
+
+# Shared response cache entry for the serialized dashboard. Admin writes below
+# drop it; ordinary user activity (sign-ups, project changes) is left to its TTL.
+DASHBOARD_CACHE_KEY = "admin:dashboard"
+
+# Management listing orders; each ends in the unique id so keyset cursors are unambiguous
+USERS_MANAGEMENT_SORT = [("created_at", -1), ("id", -1)]
+PROJECTS_MANAGEMENT_SORT = [("created_at", -1), ("id", -1)]
+SYSTEM_LOGS_SORT = [("timestamp", -1), ("id", -1)]
+
+def _sample_system() -> Dict[str, float]:
+    """CPU (since the previous call), memory and disk usage percentages"""
+    return {
+        "cpu_usage": psutil.cpu_percent(),
+        "memory_usage": psutil.virtual_memory().percent,
+        "disk_usage": psutil.disk_usage('/').percent
+    }
+
+async def _facet_counts(collection, match: Dict[str, Any], filters: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """Count documents matching each named filter in one $facet round-trip.
+
+    $facet cannot use indexes, so the leading indexed match narrows the input
+    to the recent documents the filters are drawn from.
+    """
+    facets = {
+        name: ([{"$match": sub_match}] if sub_match else []) + [{"$count": "n"}]
+        for name, sub_match in filters.items()
+    }
+    result = await collection.aggregate([{"$match": match}, {"$facet": facets}]).to_list(1)
+    row = result[0] if result else {}
+    return {name: row[name][0]["n"] if row.get(name) else 0 for name in filters}
+
 class AdminService:
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(self, db: AsyncIOMotorDatabase, response_cache=None):
         self.db = db
+        self.response_cache = response_cache
         self.admin_collection = db.admin_users
         self.logs_collection = db.system_logs
         self.settings_collection = db.platform_settings
+        # system_logs may be a time-series collection (no unique _id), so no retries
+        self.log_buffer = WriteBuffer(self.logs_collection, max_batch=500, flush_interval=0.1, retry=False)
+        self.rollups_collection = db.analytics_rollups
+        self._rollup_task: Optional[asyncio.Task] = None
+        self._rollups_ready = False
+        self._sampler_task: Optional[asyncio.Task] = None
+        self._system_sample: Optional[Dict[str, float]] = None
+        # Follow-up writes that need not hold up the admin response
+        self._background_tasks: Set[asyncio.Task] = set()
+        # Admin membership and platform settings change rarely; keep short-lived copies.
+        # Admins are revoked outside the app, so that TTL bounds how long a revoked
+        # admin keeps access.
+        self._admin_cache: TTLCache = TTLCache(maxsize=10000, ttl=30)
+        self._settings_cache: TTLCache = TTLCache(maxsize=1, ttl=30)
+        # Only one request reloads settings (or seeds the defaults) at a time
+        self._settings_lock = asyncio.Lock()
 
     async def create_admin_user(self, user_id: str, role: str = "admin", created_by: str = "system") -> AdminUser:
         """Create a new admin user"""
@@ -24,91 +87,94 @@ class AdminService:
             created_by=created_by
         )
         
-        admin_dict = admin_user.dict()
+        admin_dict = admin_user.model_dump()
         await self.admin_collection.insert_one(admin_dict)
+        self._admin_cache.pop(user_id, None)
         return admin_user
 
     async def is_admin(self, user_id: str) -> bool:
         """Check if user is admin"""
+        cached = self._admin_cache.get(user_id)
+        if cached is not None:
+            return cached
+
         admin = await self.admin_collection.find_one({
             "user_id": user_id,
             "is_active": True
-        })
-        return admin is not None
+        }, {"_id": 1})
+        result = admin is not None
+        self._admin_cache[user_id] = result
+        return result
 
     async def get_dashboard_data(self) -> DashboardData:
         """Get comprehensive dashboard data"""
-        # User statistics
-        total_users = await self.db.users.count_documents({})
-        active_users = await self.db.users.count_documents({"is_active": True})
-        
-        today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+        today = utc_now().replace(hour=0, minute=0, second=0, microsecond=0)
         week_ago = today - timedelta(days=7)
         
-        new_users_today = await self.db.users.count_documents({
-            "created_at": {"$gte": today}
-        })
-        new_users_week = await self.db.users.count_documents({
-            "created_at": {"$gte": week_ago}
-        })
+        # Recent-window counts share one $facet per collection behind an indexed
+        # $match, totals come from collection metadata and the active-user count
+        # from the (is_active, created_at) index; everything runs together
+        queries = asyncio.gather(
+            self.db.users.estimated_document_count(),
+            self.db.users.count_documents({"is_active": True}),
+            _facet_counts(self.db.users, {"created_at": {"$gte": week_ago}}, {
+                "today": {"created_at": {"$gte": today}},
+                "week": {}
+            }),
+            self.db.projects.estimated_document_count(),
+            _facet_counts(self.db.projects, {"created_at": {"$gte": week_ago}}, {
+                "today": {"created_at": {"$gte": today}},
+                "week": {}
+            }),
+            self.db.code_generations.estimated_document_count(),
+            _facet_counts(self.logs_collection, {"timestamp": {"$gte": today}}, {
+                "api_calls": {"component": "api"},
+                "errors": {"level": "ERROR"}
+            }),
+            self.db.projects.find(
+                {}, {"name": 1, "created_at": 1, "owner_id": 1}
+            ).sort("created_at", -1).limit(10).to_list(length=None)
+        )
+
+        # Read the background sample; sample inline only if the sampler isn't running
+        system_sample = self._system_sample or _sample_system()
+
+        (
+            total_users, active_users, user_counts, total_projects, project_counts,
+            ai_generations, log_counts, recent_projects
+        ) = await queries
 
         user_stats = UserStats(
             total_users=total_users,
             active_users=active_users,
-            new_users_today=new_users_today,
-            new_users_week=new_users_week
+            new_users_today=user_counts["today"],
+            new_users_week=user_counts["week"]
         )
 
-        # Project statistics
-        total_projects = await self.db.projects.count_documents({})
-        projects_today = await self.db.projects.count_documents({
-            "created_at": {"$gte": today}
-        })
-        projects_week = await self.db.projects.count_documents({
-            "created_at": {"$gte": week_ago}
-        })
-        ai_generations = await self.db.code_generations.count_documents({})
-
         project_stats = ProjectStats(
             total_projects=total_projects,
-            projects_today=projects_today,
-            projects_week=projects_week,
+            projects_today=project_counts["today"],
+            projects_week=project_counts["week"],
             ai_generations=ai_generations
         )
 
-        # System statistics
-        cpu_usage = psutil.cpu_percent()
-        memory = psutil.virtual_memory()
-        disk = psutil.disk_usage('/')
-        
-        api_calls_today = await self.logs_collection.count_documents({
-            "timestamp": {"$gte": today},
-            "component": "api"
-        })
-        errors_today = await self.logs_collection.count_documents({
-            "timestamp": {"$gte": today},
-            "level": "ERROR"
-        })
-
         system_stats = SystemStats(
-            cpu_usage=cpu_usage,
-            memory_usage=memory.percent,
-            disk_usage=disk.percent,
-            api_calls_today=api_calls_today,
-            errors_today=errors_today
+            **system_sample,
+            api_calls_today=log_counts["api_calls"],
+            errors_today=log_counts["errors"]
         )
 
-        # Recent activities
+        # Recent activities; every owner email comes from one $in query
+        owner_ids = list({project["owner_id"] for project in recent_projects})
+        owners = {
+            user["id"]: user["email"]
+            async for user in self.db.users.find({"id": {"$in": owner_ids}}, {"_id": 0, "id": 1, "email": 1})
+        }
         recent_activities = []
-        recent_projects = await self.db.projects.find(
-            {}, {"name": 1, "created_at": 1, "owner_id": 1}
-        ).sort("created_at", -1).limit(10).to_list(length=None)
-        
         for project in recent_projects:
-            user = await self.db.users.find_one({"id": project["owner_id"]}, {"email": 1})
             recent_activities.append({
                 "type": "project_created",
-                "message": f"New project '{project['name']}' created by {user['email'] if user else 'Unknown'}",
+                "message": f"New project '{project['name']}' created by {owners.get(project['owner_id'], 'Unknown')}",
                 "timestamp": project["created_at"],
                 "icon": "folder"
             })
@@ -120,37 +186,49 @@ class AdminService:
             recent_activities=recent_activities[:10]
         )
 
-    async def get_users_management(self, skip: int = 0, limit: int = 50) -> List[UserManagement]:
-        """Get users for management"""
+    async def get_users_management(self, skip: int = 0, limit: int = 50, cursor: Optional[str] = None) -> List[UserManagement]:
+        """Get users for management; pass a page's X-Next-Cursor as `cursor` to page by key instead of skip
+
+        Raises ValueError for a malformed cursor.
+        """
         users = []
         
+        match: Dict[str, Any] = {
+            "id": {"$exists": True},  # Only include users with UUID id field
+            "created_at": {"$exists": True}  # Only include users with created_at field
+        }
+        if cursor:
+            match = {"$and": [match, keyset_filter(USERS_MANAGEMENT_SORT, decode_cursor(cursor, USERS_MANAGEMENT_SORT))]}
+            skip = 0
+        
         # Aggregate users with project counts - only include users with 'id' field
         pipeline = [
-            {
-                "$match": {
-                    "id": {"$exists": True},  # Only include users with UUID id field
-                    "created_at": {"$exists": True}  # Only include users with created_at field
-                }
-            },
+            {"$match": match},
+            {"$sort": dict(USERS_MANAGEMENT_SORT)},
+            {"$skip": skip},
+            {"$limit": limit},
+            # Count each listed user's projects on the owner_id index instead of joining them all
             {
                 "$lookup": {
                     "from": "projects",
-                    "localField": "id",
-                    "foreignField": "owner_id",
-                    "as": "projects"
+                    "let": {"user_id": "$id"},
+                    "pipeline": [
+                        {"$match": {"$expr": {"$eq": ["$owner_id", "$$user_id"]}}},
+                        {"$count": "n"}
+                    ],
+                    "as": "project_counts"
                 }
             },
             {
                 "$addFields": {
-                    "projects_count": {"$size": "$projects"}
+                    "projects_count": {"$ifNull": [{"$arrayElemAt": ["$project_counts.n", 0]}, 0]}
                 }
-            },
-            {"$sort": {"created_at": -1}},
-            {"$skip": skip},
-            {"$limit": limit}
+            }
         ]
         
-        async for user in self.db.users.aggregate(pipeline):
+        # Whole page in the first batch, no getMore round-trips
+        docs = await self.db.users.aggregate(pipeline, batchSize=limit).to_list(length=limit)
+        for user in docs:
             users.append(UserManagement(
                 id=user["id"],
                 email=user["email"],
@@ -164,12 +242,24 @@ class AdminService:
         
         return users
 
-    async def get_projects_management(self, skip: int = 0, limit: int = 50) -> List[ProjectManagement]:
-        """Get projects for management"""
+    async def get_projects_management(self, skip: int = 0, limit: int = 50, cursor: Optional[str] = None) -> List[ProjectManagement]:
+        """Get projects for management; pass a page's X-Next-Cursor as `cursor` to page by key instead of skip
+
+        Raises ValueError for a malformed cursor.
+        """
         projects = []
         
-        # Aggregate projects with owner info
-        pipeline = [
+        match_stage = []
+        if cursor:
+            values = decode_cursor(cursor, PROJECTS_MANAGEMENT_SORT)
+            match_stage = [{"$match": keyset_filter(PROJECTS_MANAGEMENT_SORT, values)}]
+            skip = 0
+        
+        # Page first so only `limit` projects join their owner, then keep only the listed fields
+        pipeline = match_stage + [
+            {"$sort": dict(PROJECTS_MANAGEMENT_SORT)},
+            {"$skip": skip},
+            {"$limit": limit},
             {
                 "$lookup": {
                     "from": "users",
@@ -178,21 +268,31 @@ class AdminService:
                     "as": "owner"
                 }
             },
-            {"$sort": {"created_at": -1}},
-            {"$skip": skip},
-            {"$limit": limit}
+            {
+                "$project": {
+                    "_id": 0,
+                    "id": 1,
+                    "name": 1,
+                    "created_at": 1,
+                    "updated_at": 1,
+                    "is_public": 1,
+                    "initial_prompt": 1,
+                    # Only the length of the (possibly large) code leaves the server
+                    "code_length": {"$strLenCP": {"$ifNull": ["$generated_code", ""]}},
+                    "owner_email": {"$arrayElemAt": ["$owner.email", 0]}
+                }
+            }
         ]
         
-        async for project in self.db.projects.aggregate(pipeline):
-            owner = project["owner"][0] if project["owner"] else {}
-            generated_code = project.get("generated_code", "") or ""  # Handle None values
+        docs = await self.db.projects.aggregate(pipeline, batchSize=limit).to_list(length=limit)
+        for project in docs:
             projects.append(ProjectManagement(
                 id=project["id"],
                 name=project["name"],
-                owner_email=owner.get("email", "Unknown"),
+                owner_email=project.get("owner_email") or "Unknown",
                 created_at=project["created_at"],
                 updated_at=project["updated_at"],
-                code_length=len(generated_code),
+                code_length=project["code_length"],
                 is_public=project.get("is_public", False),
                 initial_prompt=project.get("initial_prompt")
             ))
@@ -203,71 +303,160 @@ class AdminService:
         """Update user active status"""
         result = await self.db.users.update_one(
             {"id": user_id},
-            {"$set": {"is_active": is_active, "updated_at": datetime.utcnow()}}
+            {"$set": {"is_active": is_active, "updated_at": utc_now()}}
         )
+        self._admin_cache.pop(user_id, None)
+        if result.modified_count > 0:
+            # Active-user counts changed; don't serve them stale for a minute
+            await self._invalidate_dashboard()
         return result.modified_count > 0
 
     async def delete_project(self, project_id: str) -> bool:
         """Delete a project"""
         result = await self.db.projects.delete_one({"id": project_id})
         if result.deleted_count > 0:
-            # Also delete related code generations
-            await self.db.code_generations.delete_many({"project_id": project_id})
-            await self.log_system_event("INFO", f"Project {project_id} deleted by admin", "admin")
+            # Also delete related code generations, after responding
+            self._spawn(self._delete_project_generations(project_id))
+            self.log_system_event("INFO", f"Project {project_id} deleted by admin", "admin")
         return result.deleted_count > 0
 
-    async def get_system_logs(self, level: Optional[str] = None, limit: int = 100) -> List[SystemLog]:
-        """Get system logs"""
-        query = {}
+    async def _delete_project_generations(self, project_id: str) -> None:
+        """Cascade a project deletion, then drop the dashboard that counted it"""
+        await self.db.code_generations.delete_many({"project_id": project_id})
+        await self._invalidate_dashboard()
+
+    async def _invalidate_dashboard(self) -> None:
+        if self.response_cache is not None:
+            await self.response_cache.delete(DASHBOARD_CACHE_KEY)
+
+    async def get_system_logs(
+        self,
+        level: Optional[str] = None,
+        limit: int = 100,
+        cursor: Optional[str] = None,
+        include_metadata: bool = False
+    ) -> List[SystemLog]:
+        """Get system logs, optionally after a page's X-Next-Cursor; metadata only on request
+
+        Raises ValueError for a malformed cursor.
+        """
+        query: Dict[str, Any] = {}
         if level:
             query["level"] = level
+        if cursor:
+            query = {"$and": [query, keyset_filter(SYSTEM_LOGS_SORT, decode_cursor(cursor, SYSTEM_LOGS_SORT))]}
         
-        logs = []
-        async for log in self.logs_collection.find(query).sort("timestamp", -1).limit(limit):
-            logs.append(SystemLog(**log))
+        projection = {"_id": 0} if include_metadata else {"_id": 0, "metadata": 0}
         
-        return logs
-
-    async def log_system_event(self, level: str, message: str, component: str, user_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None):
-        """Log system event"""
-        log = SystemLog(
-            level=level,
-            message=message,
-            component=component,
-            user_id=user_id,
-            metadata=metadata
-        )
+        docs = await self.logs_collection.find(query, projection).sort(SYSTEM_LOGS_SORT).limit(limit).batch_size(limit).to_list(length=limit)
         
-        await self.logs_collection.insert_one(log.dict())
+        # We wrote every one of these documents, so skip re-validating them
+        return [SystemLog.model_construct(**log) for log in docs]
+
+    def log_system_event(self, level: str, message: str, component: str, user_id: Optional[str] = None, metadata: Optional[Dict[str, Any]] = None):
+        """Queue a system event; the log buffer writes it in the background"""
+        # Built as a plain document: every field comes from our own code, so
+        # there is nothing for SystemLog validation to catch on this hot path
+        self.log_buffer.put({
+            "id": new_id(),
+            "level": level,
+            "message": message,
+            "component": component,
+            "timestamp": utc_now(),
+            "user_id": user_id,
+            "metadata": metadata
+        })
+
+    def start_analytics_rollups(self):
+        """Start the background task that keeps analytics rollups fresh"""
+        if self._rollup_task is None:
+            self._rollup_task = asyncio.get_running_loop().create_task(self._rollup_loop())
+
+    async def _rollup_loop(self):
+        while True:
+            try:
+                await self.compute_daily_analytics()
+            except Exception:
+                logger.exception("Analytics rollup failed")
+            await asyncio.sleep(ANALYTICS_ROLLUP_INTERVAL)
+
+    def start_system_sampler(self):
+        """Start the background task that samples host usage for the dashboard"""
+        if self._sampler_task is None:
+            self._sampler_task = asyncio.get_running_loop().create_task(self._sampler_loop())
+
+    async def _sampler_loop(self):
+        while True:
+            try:
+                self._system_sample = _sample_system()
+            except Exception:
+                logger.exception("System usage sampling failed")
+            await asyncio.sleep(SYSTEM_SAMPLE_INTERVAL)
+
+    def _spawn(self, coro) -> None:
+        """Run `coro` in the background, keeping a reference until it finishes"""
+        task = asyncio.get_running_loop().create_task(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_done)
+
+    def _background_done(self, task: asyncio.Task) -> None:
+        self._background_tasks.discard(task)
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Admin background task failed: %s", task.exception())
+
+    async def close(self):
+        """Stop background work and flush queued system events"""
+        if self._background_tasks:
+            await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        for task in (self._rollup_task, self._sampler_task):
+            if task is not None:
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._rollup_task = None
+        self._sampler_task = None
+        await self.log_buffer.stop()
 
     async def get_platform_settings(self) -> PlatformSettings:
         """Get platform settings"""
-        settings = await self.settings_collection.find_one({})
-        if settings:
-            return PlatformSettings(**settings)
-        else:
-            # Create default settings
-            default_settings = PlatformSettings()
-            await self.settings_collection.insert_one(default_settings.dict())
-            return default_settings
+        cached = self._settings_cache.get("settings")
+        if cached is not None:
+            return cached
+
+        async with self._settings_lock:
+            cached = self._settings_cache.get("settings")
+            if cached is not None:
+                return cached
+
+            settings = await self.settings_collection.find_one({})
+            if settings:
+                platform_settings = PlatformSettings(**settings)
+            else:
+                # Create default settings
+                platform_settings = PlatformSettings()
+                await self.settings_collection.insert_one(platform_settings.model_dump())
+            self._settings_cache["settings"] = platform_settings
+            return platform_settings
 
     async def update_platform_settings(self, settings: PlatformSettings) -> bool:
         """Update platform settings"""
         result = await self.settings_collection.replace_one(
             {},
-            settings.dict(),
+            settings.model_dump(),
             upsert=True
         )
-        await self.log_system_event("INFO", "Platform settings updated", "admin")
+        # What was just written is the current value; no need to read it back
+        self._settings_cache["settings"] = settings
+        self.log_system_event("INFO", "Platform settings updated", "admin")
         return result.acknowledged
 
-    async def get_usage_analytics(self, days: int = 30) -> Dict[str, Any]:
-        """Get usage analytics for the last N days"""
-        end_date = datetime.utcnow()
+    async def compute_daily_analytics(self, days: int = ANALYTICS_WINDOW_DAYS):
+        """Recompute per-day counts for the analytics window into analytics_rollups"""
+        end_date = utc_now()
         start_date = end_date - timedelta(days=days)
         
-        # Daily user registrations
-        daily_users = []
         pipeline = [
             {
                 "$match": {
@@ -284,34 +473,57 @@ class AdminService:
                     },
                     "count": {"$sum": 1}
                 }
-            },
-            {"$sort": {"_id": 1}}
+            }
         ]
         
-        async for day in self.db.users.aggregate(pipeline):
-            daily_users.append({
-                "date": day["_id"],
-                "count": day["count"]
-            })
-
-        # Daily project creation
-        daily_projects = []
-        async for day in self.db.projects.aggregate(pipeline):
-            daily_projects.append({
-                "date": day["_id"],
-                "count": day["count"]
-            })
-
-        # AI generation stats
-        ai_generations = []
-        async for day in self.db.code_generations.aggregate(pipeline):
-            ai_generations.append({
-                "date": day["_id"],
-                "count": day["count"]
-            })
+        sources = {
+            "daily_users": self.db.users,
+            "daily_projects": self.db.projects,
+            "ai_generations": self.db.code_generations
+        }
+        
+        # The three per-day groupings are independent; run them concurrently
+        results = await asyncio.gather(*[
+            collection.aggregate(pipeline, allowDiskUse=True).to_list(length=None)
+            for collection in sources.values()
+        ])
+        
+        updates = []
+        for metric, days_counted in zip(sources, results):
+            for day in days_counted:
+                updates.append(UpdateOne(
+                    {"metric": metric, "date": day["_id"]},
+                    {"$set": {"count": day["count"], "updated_at": end_date}},
+                    upsert=True
+                ))
+        
+        if updates:
+            await self.rollups_collection.bulk_write(updates, ordered=False)
+        self._rollups_ready = True
 
-        return {
-            "daily_users": daily_users,
-            "daily_projects": daily_projects,
-            "ai_generations": ai_generations
-        }
\ No newline at end of file
+    async def get_usage_analytics(self, days: int = 30) -> Dict[str, Any]:
+        """Get usage analytics for the last N days from the precomputed rollups"""
+        if not self._rollups_ready:
+            await self.compute_daily_analytics()
+        
+        cutoff = (utc_now() - timedelta(days=days)).strftime("%Y-%m-%d")
+        analytics: Dict[str, List[Dict[str, Any]]] = {
+            "daily_users": [],
+            "daily_projects": [],
+            "ai_generations": []
+        }
+        
+        cursor = self.rollups_collection.find(
+            {"date": {"$gte": cutoff}},
+            {"_id": 0, "metric": 1, "date": 1, "count": 1}
+        ).sort("date", 1)
+        
+        async for rollup in cursor:
+            series = analytics.get(rollup["metric"])
+            if series is not None:
+                series.append({
+                    "date": rollup["date"],
+                    "count": rollup["count"]
+                })
+        
+        return analytics
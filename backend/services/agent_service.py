@@ -7,6 +7,14 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 from emergentintegrations.llm.chat import LlmChat, UserMessage
 
+# Patterns applied to every model response, compiled once at import
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+CODE_BLOCK_RES = [
+    re.compile(r'```(?:javascript|jsx|js|react)\n(.*?)```', re.DOTALL),
+    re.compile(r'```\n(.*?)```', re.DOTALL),
+    re.compile(r'`([^`]+)`', re.DOTALL),
+]
+
 class AgentService:
     """
     AI Agent that autonomously plans, thinks, and acts
@@ -98,7 +106,7 @@ class AgentService:
         
         try:
             # Extract JSON from response
-            json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
+            json_match = JSON_OBJECT_RE.search(response_text)
             if json_match:
                 plan = json.loads(json_match.group())
             else:
@@ -361,14 +369,8 @@ class AgentService:
         """Extract JavaScript/React code from AI response"""
         
         # Try to find code blocks
-        code_patterns = [
-            r'```(?:javascript|jsx|js|react)\n(.*?)```',
-            r'```\n(.*?)```',
-            r'`([^`]+)`'
-        ]
-        
-        for pattern in code_patterns:
-            match = re.search(pattern, response_text, re.DOTALL)
+        for pattern in CODE_BLOCK_RES:
+            match = pattern.search(response_text)
             if match:
                 return match.group(1).strip()
         
@@ -1,21 +1,11 @@
 import os
-import asyncio
 from dotenv import load_dotenv
 from emergentintegrations.llm.chat import LlmChat, UserMessage
+from infrastructure.code_fences import strip_fences
 
 load_dotenv()
 
-class AIService:
-    def __init__(self):
-        self.api_key = os.environ.get('EMERGENT_LLM_KEY')
-        if not self.api_key:
-            raise ValueError("EMERGENT_LLM_KEY not found in environment variables")
-    
-    async def generate_code(self, prompt: str, session_id: str) -> str:
-        """Generate React code based on user prompt"""
-        try:
-            # Initialize chat with code generation system message
-            system_message = """You are an expert React developer. Generate clean, modern React components based on user prompts.
+CODE_SYSTEM_MESSAGE = """You are an expert React developer. Generate clean, modern React components based on user prompts.
 
 Rules:
 1. Always return complete, valid React functional components
@@ -44,14 +34,18 @@ const App = () => {
 export default App;
 ```"""
 
-            chat = LlmChat(
-                api_key=self.api_key,
-                session_id=f"code_gen_{session_id}",
-                system_message=system_message
-            ).with_model("openai", "gpt-4o-mini")
+CHAT_SYSTEM_MESSAGE = """You are Lovable AI, a helpful assistant that helps users build applications through conversation.
+
+Your role:
+1. Help users refine their app ideas
+2. Suggest improvements and features
+3. Answer questions about the generated code
+4. Provide guidance on UI/UX best practices
+5. Be encouraging and supportive
+
+Keep responses conversational, helpful, and focused on development."""
 
-            # Create enhanced prompt for code generation
-            enhanced_prompt = f"""Create a React component for: {prompt}
+ENHANCED_CODE_PROMPT = """Create a React component for: {prompt}
 
 Requirements:
 - Use functional components with hooks
@@ -61,21 +55,34 @@ Requirements:
 - Ensure accessibility
 - Return complete, ready-to-use code"""
 
-            user_message = UserMessage(text=enhanced_prompt)
+class AIService:
+    def __init__(self):
+        self.api_key = os.environ.get('EMERGENT_LLM_KEY')
+        if not self.api_key:
+            raise ValueError("EMERGENT_LLM_KEY not found in environment variables")
+    
+    def _new_chat(self, session_id: str, system_message: str) -> LlmChat:
+        """A fresh chat for one call
+
+        Chats accumulate history and resend it with every message, so each
+        generation starts from just the system prompt. The HTTP transport
+        underneath is pooled by the client library, not by the chat object.
+        """
+        return LlmChat(
+            api_key=self.api_key,
+            session_id=session_id,
+            system_message=system_message
+        ).with_model("openai", "gpt-4o-mini")
+    
+    async def generate_code(self, prompt: str, session_id: str) -> str:
+        """Generate React code based on user prompt"""
+        try:
+            chat = self._new_chat(f"code_gen_{session_id}", CODE_SYSTEM_MESSAGE)
+
+            user_message = UserMessage(text=ENHANCED_CODE_PROMPT.format(prompt=prompt))
             response = await chat.send_message(user_message)
             
-            # Extract code from response (remove markdown if present)
-            code = response.strip()
-            if code.startswith('```jsx') or code.startswith('```javascript') or code.startswith('```'):
-                lines = code.split('\n')
-                # Remove first and last lines if they're markdown
-                if lines[0].startswith('```'):
-                    lines = lines[1:]
-                if lines and lines[-1].strip() == '```':
-                    lines = lines[:-1]
-                code = '\n'.join(lines)
-            
-            return code
+            return strip_fences(response)
             
         except Exception as e:
             print(f"Error generating code: {e}")
@@ -85,22 +92,7 @@ Requirements:
     async def generate_response(self, prompt: str, session_id: str) -> str:
         """Generate conversational AI response"""
         try:
-            system_message = """You are Lovable AI, a helpful assistant that helps users build applications through conversation.
-
-Your role:
-1. Help users refine their app ideas
-2. Suggest improvements and features
-3. Answer questions about the generated code
-4. Provide guidance on UI/UX best practices
-5. Be encouraging and supportive
-
-Keep responses conversational, helpful, and focused on development."""
-
-            chat = LlmChat(
-                api_key=self.api_key,
-                session_id=f"chat_{session_id}",
-                system_message=system_message
-            ).with_model("openai", "gpt-4o-mini")
+            chat = self._new_chat(f"chat_{session_id}", CHAT_SYSTEM_MESSAGE)
 
             user_message = UserMessage(text=prompt)
             response = await chat.send_message(user_message)
@@ -1,34 +1,57 @@
 import os
 import jwt
-import uuid
-from datetime import datetime, timedelta
+import asyncio
+import time
+import hashlib
+import orjson
+from datetime import timedelta
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from models.common import new_id, utc_now
+from infrastructure.cache import ResultCache
 
 SECRET_KEY = os.environ.get("JWT_SECRET_KEY", "your-secret-key-here")
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30 days
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# bcrypt cost; each step doubles hashing time. Existing hashes keep verifying
+# at whatever cost they were created with.
+BCRYPT_ROUNDS = int(os.environ.get("BCRYPT_ROUNDS", 12))
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+# Stored user fields that are safe to hand to routes
+PUBLIC_USER_PROJECTION = {"_id": 0, "hashed_password": 0}
+
+# Resolved users are reused for at most this long, and never past token expiry
+SESSION_CACHE_TTL = 120
+
+def _session_key(token: str) -> str:
+    """Cache key for a token; the raw token never leaves the process"""
+    return f"session:{hashlib.sha256(token.encode()).hexdigest()}"
 
 class AuthService:
-    def __init__(self, db: AsyncIOMotorDatabase):
+    def __init__(self, db: AsyncIOMotorDatabase, session_cache=None):
         self.db = db
+        # Shared (Redis) or in-process cache of orjson-encoded user records
+        self.session_cache = session_cache or ResultCache(maxsize=10000, ttl=SESSION_CACHE_TTL)
     
-    def verify_password(self, plain_password: str, hashed_password: str) -> bool:
-        return pwd_context.verify(plain_password, hashed_password)
+    async def verify_password(self, plain_password: str, hashed_password: str) -> bool:
+        """Check a password in a worker thread; bcrypt would otherwise block the event loop"""
+        return await asyncio.to_thread(pwd_context.verify, plain_password, hashed_password)
     
-    def get_password_hash(self, password: str) -> str:
-        return pwd_context.hash(password)
+    async def get_password_hash(self, password: str) -> str:
+        """Hash a password in a worker thread"""
+        return await asyncio.to_thread(pwd_context.hash, password)
     
     def create_access_token(self, data: dict, expires_delta: timedelta = None):
         to_encode = data.copy()
         if expires_delta:
-            expire = datetime.utcnow() + expires_delta
+            expire = utc_now() + expires_delta
         else:
-            expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
-        to_encode.update({"exp": expire})
+            expire = utc_now() + timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES)
+        to_encode.update({"exp": expire, "iat": utc_now()})
         encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
         return encoded_jwt
     
@@ -41,34 +64,53 @@ class AuthService:
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Token has expired"
             )
-        except jwt.JWTError:
+        except jwt.InvalidTokenError:
             raise HTTPException(
                 status_code=status.HTTP_401_UNAUTHORIZED,
                 detail="Could not validate credentials"
             )
     
+    async def issue_access_token(self, user: dict) -> str:
+        """Create a token for `user` and prime the session cache with it
+
+        Requests made with a freshly issued token are then resolved without
+        a database lookup until the cache entry expires.
+        """
+        token = self.create_access_token(data={"sub": user["id"]})
+        await self.session_cache.set(_session_key(token), orjson.dumps(user), SESSION_CACHE_TTL)
+        return token
+    
+    async def get_user_for_token(self, token: str):
+        """Resolve a bearer token to its user, caching the result briefly"""
+        key = _session_key(token)
+        cached = await self.session_cache.get(key)
+        if cached is not None:
+            return orjson.loads(cached)
+        
+        payload = self.decode_token(token)
+        user_id = payload.get("sub")
+        if not user_id:
+            return None
+        
+        user = await self.get_user_by_id(user_id)
+        ttl = int(min(SESSION_CACHE_TTL, payload.get("exp", 0) - time.time()))
+        if user and ttl > 0:
+            await self.session_cache.set(key, orjson.dumps(user), ttl)
+        return user
+    
     async def get_user_by_email(self, email: str):
         user = await self.db.users.find_one({"email": email})
         return user
     
     async def get_user_by_id(self, user_id: str):
-        user = await self.db.users.find_one({"id": user_id})
-        if user:
-            # Remove sensitive data and MongoDB ObjectId
-            user_response = user.copy()
-            user_response.pop("hashed_password", None)
-            user_response.pop("_id", None)
-            return user_response
-        return None
+        # Sensitive data and the MongoDB ObjectId are excluded server-side
+        return await self.db.users.find_one({"id": user_id}, PUBLIC_USER_PROJECTION)
     
     async def create_user(self, user_data: dict):
         # Generate UUID for user
-        user_data["id"] = str(uuid.uuid4())
-        
-        # Hash password
-        user_data["hashed_password"] = self.get_password_hash(user_data.pop("password"))
+        user_data["id"] = new_id()
         
-        # Check if user exists
+        # Check if user exists before paying for the hash
         existing_user = await self.get_user_by_email(user_data["email"])
         if existing_user:
             raise HTTPException(
@@ -76,20 +118,27 @@ class AuthService:
                 detail="Email already registered"
             )
         
+        # Hash password
+        user_data["hashed_password"] = await self.get_password_hash(user_data.pop("password"))
+        
         # Create user
         await self.db.users.insert_one(user_data)
         
-        # Return user data without sensitive info
+        # Return user data without sensitive info or the ObjectId insert_one added
         user_response = user_data.copy()
         user_response.pop("hashed_password", None)
+        user_response.pop("_id", None)
         
         return user_response
     
     async def authenticate_user(self, email: str, password: str):
         user = await self.get_user_by_email(email)
-        if not user:
+        if not user or not user.get("hashed_password"):
+            # Spend the same bcrypt time as a real check so response timing
+            # does not reveal which emails are registered
+            await asyncio.to_thread(pwd_context.dummy_verify)
             return False
-        if not self.verify_password(password, user.get("hashed_password", "")):
+        if not await self.verify_password(password, user["hashed_password"]):
             return False
         
         # Remove sensitive data and MongoDB ObjectId
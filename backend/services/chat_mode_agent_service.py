@@ -1,9 +1,182 @@
 import os
 import json
 import re
-from typing import Dict, List, Optional, Any
+import asyncio
+from bisect import bisect_right
+from functools import lru_cache
+from typing import Dict, List, Optional, Any, Set, Tuple
 from datetime import datetime
 from emergentintegrations.llm.chat import LlmChat, UserMessage
+from infrastructure.cache import ResultCache, cache_key
+
+CHAT_AGENT_MODEL = ("anthropic", "claude-3-5-sonnet-20241022")
+
+# System prompts, kept byte-identical across calls (the per-request query and
+# context always go in the user message after them)
+DEBUGGING_SYSTEM_MESSAGE = """You are a senior software engineer and debugging expert.
+        
+        Help users debug issues through multi-step reasoning:
+        1. Understand the problem
+        2. Analyze potential causes
+        3. Suggest investigation steps
+        4. Provide solutions
+        
+        DO NOT edit or generate code - only provide guidance, explanations, and debugging strategies.
+        
+        Be thorough, methodical, and educational in your approach."""
+
+PLANNING_SYSTEM_MESSAGE = """You are a senior technical architect and project planner.
+        
+        Help users plan and structure their projects through strategic thinking:
+        1. Break down complex requirements
+        2. Suggest architectural approaches
+        3. Identify potential challenges
+        4. Recommend best practices
+        
+        Provide guidance without writing actual code - focus on planning and strategy."""
+
+LOG_ANALYSIS_SYSTEM_MESSAGE = """You are an expert in log analysis and system monitoring.
+        
+        Analyze logs to help identify issues, patterns, and solutions:
+        1. Parse log entries for errors and warnings
+        2. Identify patterns and root causes
+        3. Suggest investigation paths
+        4. Recommend monitoring improvements
+        
+        Provide insights without writing code - focus on analysis and interpretation."""
+
+DATABASE_SYSTEM_MESSAGE = """You are a database expert and SQL consultant.
+        
+        Help users understand and work with databases:
+        1. Explain database concepts
+        2. Suggest query approaches
+        3. Help with data modeling
+        4. Provide best practices
+        
+        Guide without writing actual SQL - focus on explanation and strategy."""
+
+EXPLANATION_SYSTEM_MESSAGE = """You are an expert technical educator and mentor.
+        
+        Explain complex concepts in clear, understandable ways:
+        1. Break down complex topics
+        2. Use analogies and examples
+        3. Provide context and background
+        4. Suggest learning resources
+        
+        Focus on education and understanding rather than code implementation."""
+
+GENERAL_SYSTEM_MESSAGE = """You are a helpful AI assistant specializing in web development and software engineering.
+        
+        Provide helpful, accurate information and guidance while being conversational and supportive.
+        Focus on helping users learn and understand rather than just providing answers."""
+
+REASONING_SYSTEM_MESSAGE = """You are an expert problem solver with advanced reasoning capabilities.
+        
+        Break down complex problems into steps:
+        1. Problem decomposition
+        2. Analysis of each component  
+        3. Logical reasoning chain
+        4. Solution synthesis
+        5. Validation and alternatives
+        
+        Think step by step and show your reasoning process."""
+
+# Query types in priority order: a query containing keywords of several types
+# is routed to the first of them, wherever in the query the keywords appear
+QUERY_KEYWORDS = [
+    ("debugging", ["debug", "error", "bug", "fix", "broken", "not working"]),
+    ("planning", ["plan", "architecture", "structure", "how should", "strategy"]),
+    ("file_search", ["find file", "search", "locate", "where is"]),
+    ("log_analysis", ["log", "console", "error log", "analyze log"]),
+    ("database_query", ["database", "query", "sql", "data", "table"]),
+    ("explanation", ["what is", "how does", "explain", "what does"]),
+]
+
+# One optional lookahead per type, so a single match records which types have
+# a keyword anywhere in the query
+QUERY_CLASSIFIER_RE = re.compile(
+    "".join(
+        f"(?:(?=.*?(?P<{query_type}>{'|'.join(map(re.escape, keywords))})))?"
+        for query_type, keywords in QUERY_KEYWORDS
+    ),
+    re.DOTALL
+)
+
+# Flags whether a log line mentions an error and/or a warning, in one match
+LOG_LEVEL_RE = re.compile(r"(?:(?=.*?(?P<error>error)))?(?:(?=.*?(?P<warning>warning)))?", re.IGNORECASE | re.DOTALL)
+
+# Separates paths in a PathIndex; never part of a real file path
+PATH_SEPARATOR = '\0'
+
+class PathIndex:
+    """All of a project's paths in one string, so a search scans them in one C-level pass"""
+    
+    def __init__(self, paths: Tuple[str, ...]):
+        self.text = PATH_SEPARATOR.join(paths)
+        # Offset in `text` where each path starts, for bisecting match positions
+        self.starts = []
+        offset = 0
+        for path in paths:
+            self.starts.append(offset)
+            offset += len(path) + 1
+    
+    def matching(self, pattern: re.Pattern) -> Set[int]:
+        """Indexes of the paths `pattern` matches"""
+        found = set()
+        pos = 0
+        while (match := pattern.search(self.text, pos)) is not None:
+            i = bisect_right(self.starts, match.start()) - 1
+            found.add(i)
+            # One hit per path is enough; resume at the next path
+            if i + 1 == len(self.starts):
+                break
+            pos = self.starts[i + 1]
+        return found
+
+@lru_cache(maxsize=32)
+def _path_index(paths: Tuple[str, ...]) -> PathIndex:
+    """Index for a project's paths, reused while an interactive session keeps searching it"""
+    return PathIndex(paths)
+
+def _search_files(project_files: List[Dict[str, Any]], search_term: str) -> List[Dict[str, Any]]:
+    """Match `search_term` case-insensitively against each file's path, else its first matching line"""
+    pattern = re.compile(re.escape(search_term), re.IGNORECASE)
+    # A term spanning lines can never be reported as a single matching line
+    match_content = '\n' not in search_term
+    search_results = []
+    
+    paths = tuple(file.get('path', '') for file in project_files)
+    if PATH_SEPARATOR in search_term:
+        path_hits = {i for i, path in enumerate(paths) if pattern.search(path)}
+    else:
+        path_hits = _path_index(paths).matching(pattern)
+    
+    for i, file in enumerate(project_files):
+        file_path = paths[i]
+        file_content = file.get('content', '')
+        
+        # Search in file path
+        if i in path_hits:
+            search_results.append({
+                "file": file_path,
+                "match_type": "filename",
+                "relevance": 0.9
+            })
+        
+        # Search in file content; the first match is on the first matching line,
+        # so its line is sliced out around the match offset instead of splitting
+        elif match_content and (match := pattern.search(file_content)):
+            start = file_content.rfind('\n', 0, match.start()) + 1
+            end = file_content.find('\n', match.end())
+            search_results.append({
+                "file": file_path,
+                "match_type": "content",
+                "line_number": file_content.count('\n', 0, start) + 1,
+                "line_content": file_content[start:end if end != -1 else len(file_content)].strip(),
+                "relevance": 0.7
+            })
+    
+    return search_results
 
 class ChatModeAgentService:
     """
@@ -15,6 +188,31 @@ class ChatModeAgentService:
         self.api_key = os.environ.get('EMERGENT_LLM_KEY')
         if not self.api_key:
             raise ValueError("EMERGENT_LLM_KEY not found in environment variables")
+        # Exact-match answers keyed by model, system message and prompt
+        self._response_cache = ResultCache(maxsize=1000, ttl=3600)
+    
+    async def _send_message(self, session_id: str, system_message: str, prompt: str, timeout: Optional[int] = None) -> str:
+        """Send one prompt to the agent model, reusing an identical earlier answer
+
+        Every handler starts a fresh chat, so the answer depends only on the
+        system message and the prompt (which embeds the query and its context).
+        """
+        key = cache_key("chat-agent", CHAT_AGENT_MODEL, system_message, prompt)
+        cached = await self._response_cache.get(key)
+        if cached is not None:
+            return cached
+        
+        chat_options = {"timeout": timeout} if timeout is not None else {}
+        chat = LlmChat(
+            api_key=self.api_key,
+            session_id=session_id,
+            system_message=system_message,
+            **chat_options
+        ).with_model(*CHAT_AGENT_MODEL)
+        
+        response = await chat.send_message(UserMessage(text=prompt))
+        await self._response_cache.set(key, response)
+        return response
     
     async def process_query(self, query: str, context: Dict[str, Any], session_id: str) -> Dict[str, Any]:
         """
@@ -22,7 +220,7 @@ class ChatModeAgentService:
         """
         try:
             # Determine query type
-            query_type = await self._classify_query(query)
+            query_type = self._classify_query(query)
             
             # Route to appropriate handler
             if query_type == "debugging":
@@ -47,59 +245,17 @@ class ChatModeAgentService:
                 "message": "Failed to process query"
             }
     
-    async def _classify_query(self, query: str) -> str:
+    def _classify_query(self, query: str) -> str:
         """Classify the type of query to route appropriately"""
-        
-        query_lower = query.lower()
-        
-        # Debugging keywords
-        if any(word in query_lower for word in ["debug", "error", "bug", "fix", "broken", "not working"]):
-            return "debugging"
-        
-        # Planning keywords
-        if any(word in query_lower for word in ["plan", "architecture", "structure", "how should", "strategy"]):
-            return "planning"
-        
-        # File search keywords
-        if any(word in query_lower for word in ["find file", "search", "locate", "where is"]):
-            return "file_search"
-        
-        # Log analysis keywords
-        if any(word in query_lower for word in ["log", "console", "error log", "analyze log"]):
-            return "log_analysis"
-        
-        # Database query keywords
-        if any(word in query_lower for word in ["database", "query", "sql", "data", "table"]):
-            return "database_query"
-        
-        # Explanation keywords
-        if any(word in query_lower for word in ["what is", "how does", "explain", "what does"]):
-            return "explanation"
-        
+        match = QUERY_CLASSIFIER_RE.match(query.lower())
+        for query_type, _ in QUERY_KEYWORDS:
+            if match.group(query_type) is not None:
+                return query_type
         return "general"
     
     async def _handle_debugging_query(self, query: str, context: Dict[str, Any], session_id: str) -> Dict[str, Any]:
         """Handle debugging queries with multi-step reasoning"""
         
-        system_message = """You are a senior software engineer and debugging expert.
-        
-        Help users debug issues through multi-step reasoning:
-        1. Understand the problem
-        2. Analyze potential causes
-        3. Suggest investigation steps
-        4. Provide solutions
-        
-        DO NOT edit or generate code - only provide guidance, explanations, and debugging strategies.
-        
-        Be thorough, methodical, and educational in your approach."""
-        
-        chat = LlmChat(
-            api_key=self.api_key,
-            session_id=f"debug_{session_id}",
-            system_message=system_message,
-            timeout=60  # 1 minute for debugging assistance
-        ).with_model("anthropic", "claude-3-5-sonnet-20241022")
-        
         debug_prompt = f"""
         DEBUGGING REQUEST: {query}
         
@@ -119,7 +275,8 @@ class ChatModeAgentService:
         Focus on teaching debugging methodology rather than just giving answers.
         """
         
-        response = await chat.send_message(UserMessage(text=debug_prompt))
+        # 1 minute for debugging assistance
+        response = await self._send_message(f"debug_{session_id}", DEBUGGING_SYSTEM_MESSAGE, debug_prompt, timeout=60)
         
         return {
             "success": True,
@@ -135,22 +292,6 @@ class ChatModeAgentService:
     async def _handle_planning_query(self, query: str, context: Dict[str, Any], session_id: str) -> Dict[str, Any]:
         """Handle project planning and architecture queries"""
         
-        system_message = """You are a senior technical architect and project planner.
-        
-        Help users plan and structure their projects through strategic thinking:
-        1. Break down complex requirements
-        2. Suggest architectural approaches
-        3. Identify potential challenges
-        4. Recommend best practices
-        
-        Provide guidance without writing actual code - focus on planning and strategy."""
-        
-        chat = LlmChat(
-            api_key=self.api_key,
-            session_id=f"planning_{session_id}",
-            system_message=system_message
-        ).with_model("anthropic", "claude-3-5-sonnet-20241022")
-        
         planning_prompt = f"""
         PLANNING REQUEST: {query}
         
@@ -171,7 +312,7 @@ class ChatModeAgentService:
         Focus on strategic thinking and planning methodology.
         """
         
-        response = await chat.send_message(UserMessage(text=planning_prompt))
+        response = await self._send_message(f"planning_{session_id}", PLANNING_SYSTEM_MESSAGE, planning_prompt)
         
         return {
             "success": True,
@@ -190,35 +331,8 @@ class ChatModeAgentService:
         project_files = context.get('project_files', [])
         search_term = self._extract_search_term(query)
         
-        # Perform intelligent file search
-        search_results = []
-        
-        for file in project_files:
-            file_path = file.get('path', '')
-            file_content = file.get('content', '')
-            
-            # Search in file path
-            if search_term.lower() in file_path.lower():
-                search_results.append({
-                    "file": file_path,
-                    "match_type": "filename",
-                    "relevance": 0.9
-                })
-            
-            # Search in file content
-            elif search_term.lower() in file_content.lower():
-                # Find the line with the match
-                lines = file_content.split('\n')
-                for i, line in enumerate(lines):
-                    if search_term.lower() in line.lower():
-                        search_results.append({
-                            "file": file_path,
-                            "match_type": "content",
-                            "line_number": i + 1,
-                            "line_content": line.strip(),
-                            "relevance": 0.7
-                        })
-                        break
+        # Scanning every file is CPU work; keep it off the event loop
+        search_results = await asyncio.to_thread(_search_files, project_files, search_term)
         
         # Sort by relevance
         search_results.sort(key=lambda x: x['relevance'], reverse=True)
@@ -235,22 +349,6 @@ class ChatModeAgentService:
     async def _handle_log_analysis_query(self, query: str, context: Dict[str, Any], session_id: str) -> Dict[str, Any]:
         """Handle log analysis queries"""
         
-        system_message = """You are an expert in log analysis and system monitoring.
-        
-        Analyze logs to help identify issues, patterns, and solutions:
-        1. Parse log entries for errors and warnings
-        2. Identify patterns and root causes
-        3. Suggest investigation paths
-        4. Recommend monitoring improvements
-        
-        Provide insights without writing code - focus on analysis and interpretation."""
-        
-        chat = LlmChat(
-            api_key=self.api_key,
-            session_id=f"logs_{session_id}",
-            system_message=system_message
-        ).with_model("anthropic", "claude-3-5-sonnet-20241022")
-        
         logs = context.get('logs', [])
         
         log_analysis_prompt = f"""
@@ -270,11 +368,14 @@ class ChatModeAgentService:
         Focus on helping me understand what the logs are telling us.
         """
         
-        response = await chat.send_message(UserMessage(text=log_analysis_prompt))
+        response = await self._send_message(f"logs_{session_id}", LOG_ANALYSIS_SYSTEM_MESSAGE, log_analysis_prompt)
         
         # Extract key metrics from logs
-        error_count = len([log for log in logs if 'error' in log.lower()])
-        warning_count = len([log for log in logs if 'warning' in log.lower()])
+        error_count = warning_count = 0
+        for log in logs:
+            match = LOG_LEVEL_RE.match(log)
+            error_count += match.group("error") is not None
+            warning_count += match.group("warning") is not None
         
         return {
             "success": True,
@@ -290,22 +391,6 @@ class ChatModeAgentService:
     async def _handle_database_query(self, query: str, context: Dict[str, Any], session_id: str) -> Dict[str, Any]:
         """Handle database-related queries"""
         
-        system_message = """You are a database expert and SQL consultant.
-        
-        Help users understand and work with databases:
-        1. Explain database concepts
-        2. Suggest query approaches
-        3. Help with data modeling
-        4. Provide best practices
-        
-        Guide without writing actual SQL - focus on explanation and strategy."""
-        
-        chat = LlmChat(
-            api_key=self.api_key,
-            session_id=f"database_{session_id}",
-            system_message=system_message
-        ).with_model("anthropic", "claude-3-5-sonnet-20241022")
-        
         db_prompt = f"""
         DATABASE QUERY: {query}
         
@@ -325,7 +410,7 @@ class ChatModeAgentService:
         Focus on teaching database concepts and query strategy.
         """
         
-        response = await chat.send_message(UserMessage(text=db_prompt))
+        response = await self._send_message(f"database_{session_id}", DATABASE_SYSTEM_MESSAGE, db_prompt)
         
         return {
             "success": True,
@@ -336,22 +421,6 @@ class ChatModeAgentService:
     async def _handle_explanation_query(self, query: str, context: Dict[str, Any], session_id: str) -> Dict[str, Any]:
         """Handle explanation and educational queries"""
         
-        system_message = """You are an expert technical educator and mentor.
-        
-        Explain complex concepts in clear, understandable ways:
-        1. Break down complex topics
-        2. Use analogies and examples
-        3. Provide context and background
-        4. Suggest learning resources
-        
-        Focus on education and understanding rather than code implementation."""
-        
-        chat = LlmChat(
-            api_key=self.api_key,
-            session_id=f"explanation_{session_id}",
-            system_message=system_message
-        ).with_model("anthropic", "claude-3-5-sonnet-20241022")
-        
         explanation_prompt = f"""
         EXPLANATION REQUEST: {query}
         
@@ -370,7 +439,7 @@ class ChatModeAgentService:
         Make it educational and easy to understand.
         """
         
-        response = await chat.send_message(UserMessage(text=explanation_prompt))
+        response = await self._send_message(f"explanation_{session_id}", EXPLANATION_SYSTEM_MESSAGE, explanation_prompt)
         
         return {
             "success": True,
@@ -381,18 +450,7 @@ class ChatModeAgentService:
     async def _handle_general_query(self, query: str, context: Dict[str, Any], session_id: str) -> Dict[str, Any]:
         """Handle general queries"""
         
-        system_message = """You are a helpful AI assistant specializing in web development and software engineering.
-        
-        Provide helpful, accurate information and guidance while being conversational and supportive.
-        Focus on helping users learn and understand rather than just providing answers."""
-        
-        chat = LlmChat(
-            api_key=self.api_key,
-            session_id=f"general_{session_id}",
-            system_message=system_message
-        ).with_model("anthropic", "claude-3-5-sonnet-20241022")
-        
-        response = await chat.send_message(UserMessage(text=query))
+        response = await self._send_message(f"general_{session_id}", GENERAL_SYSTEM_MESSAGE, query)
         
         return {
             "success": True,
@@ -422,23 +480,6 @@ class ChatModeAgentService:
     async def multi_step_reasoning(self, problem: str, context: Dict[str, Any], session_id: str) -> Dict[str, Any]:
         """Perform multi-step reasoning for complex problems"""
         
-        system_message = """You are an expert problem solver with advanced reasoning capabilities.
-        
-        Break down complex problems into steps:
-        1. Problem decomposition
-        2. Analysis of each component  
-        3. Logical reasoning chain
-        4. Solution synthesis
-        5. Validation and alternatives
-        
-        Think step by step and show your reasoning process."""
-        
-        chat = LlmChat(
-            api_key=self.api_key,
-            session_id=f"reasoning_{session_id}",
-            system_message=system_message
-        ).with_model("anthropic", "claude-3-5-sonnet-20241022")
-        
         reasoning_prompt = f"""
         COMPLEX PROBLEM: {problem}
         
@@ -455,7 +496,7 @@ class ChatModeAgentService:
         Show your thinking process clearly at each step.
         """
         
-        response = await chat.send_message(UserMessage(text=reasoning_prompt))
+        response = await self._send_message(f"reasoning_{session_id}", REASONING_SYSTEM_MESSAGE, reasoning_prompt)
         
         # Parse reasoning steps from response
         reasoning_steps = []
@@ -1,11 +1,10 @@
 import os
 import aiofiles
-import aiohttp
 import asyncio
 from typing import Dict, Any
-from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from fastapi import HTTPException
+from models.common import utc_now
 
 class DeploymentService:
     def __init__(self, db: AsyncIOMotorDatabase):
@@ -51,7 +50,7 @@ class DeploymentService:
                 {
                     "$set": {
                         "deployment_url": deployment_url,
-                        "updated_at": datetime.utcnow()
+                        "updated_at": utc_now()
                     }
                 }
             )
@@ -63,7 +62,7 @@ class DeploymentService:
                 "deployment_url": deployment_url,
                 "subdomain": subdomain,
                 "status": "deployed",
-                "deployed_at": datetime.utcnow()
+                "deployed_at": utc_now()
             }
             
             await self.db.deployments.insert_one(deployment_record)
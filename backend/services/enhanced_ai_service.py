@@ -1,9 +1,22 @@
 import os
 import json
 import re
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Dict, List, Optional, Any
 from datetime import datetime
 from emergentintegrations.llm.chat import LlmChat, UserMessage
+from infrastructure.code_fences import FenceStripper, strip_fences
+
+# Patterns applied to every model response, compiled once at import
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+CODE_BLOCK_RES = [
+    re.compile(r'```(?:javascript|jsx|js|react|typescript|tsx)\n(.*?)```', re.DOTALL),
+    re.compile(r'```\n(.*?)```', re.DOTALL),
+]
+REACT_COMPONENT_RES = [
+    re.compile(r'(import.*?export default.*?;)', re.DOTALL),
+    re.compile(r'(function.*?export default.*?;)', re.DOTALL),
+    re.compile(r'(const.*?export default.*?;)', re.DOTALL),
+]
 
 class EnhancedAIService:
     """
@@ -19,20 +32,34 @@ class EnhancedAIService:
         """
         Generate COMPLETE, production-ready applications with extreme quality
         """
+        async for event in self.stream_generate_code(prompt, session_id, context):
+            if event["phase"] == "complete":
+                return event["result"]
+    
+    async def stream_generate_code(self, prompt: str, session_id: str, context: Optional[Dict] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run the generation pipeline, yielding an event as each phase finishes
+        (and code_delta previews during code generation); the last event has
+        phase "complete" and carries the full result
+        """
         try:
             # Phase 1: Comprehensive Analysis & Planning
             analysis = await self._analyze_requirements(prompt, context, session_id)
+            yield {"phase": "analysis", "analysis": analysis}
             
             # Phase 2: Architecture Design
             architecture = await self._design_architecture(prompt, analysis)
+            yield {"phase": "architecture", "architecture": architecture}
             
-            # Phase 3: Complete Code Generation
-            code_result = await self._generate_complete_application(prompt, architecture, analysis, session_id)
+            # Phase 3: Complete Code Generation, previewed as the model writes it
+            async for event in self._stream_complete_application(prompt, architecture, analysis, session_id):
+                yield event
+            code_result = {"code": event["code"]}
             
             # Phase 4: Quality Assurance & Optimization
             final_result = await self._optimize_and_validate(code_result, session_id)
             
-            return {
+            yield {"phase": "complete", "result": {
                 "success": True,
                 "code": final_result["code"],
                 "metadata": {
@@ -41,14 +68,14 @@ class EnhancedAIService:
                     "quality_metrics": final_result["quality_metrics"]
                 },
                 "message": "Complete production-ready application generated with extreme quality"
-            }
+            }}
             
         except Exception as e:
-            return {
+            yield {"phase": "complete", "result": {
                 "success": False,
                 "error": str(e),
                 "message": "Failed to generate high-quality code"
-            }
+            }}
     
     async def _analyze_requirements(self, prompt: str, context: Optional[Dict] = None, session_id: str = None) -> Dict[str, Any]:
         """Deep analysis of user requirements like a senior product manager"""
@@ -112,7 +139,7 @@ class EnhancedAIService:
         response = await chat.send_message(UserMessage(text=analysis_prompt))
         
         try:
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            json_match = JSON_OBJECT_RE.search(response)
             if json_match:
                 return json.loads(json_match.group())
         except:
@@ -220,7 +247,7 @@ class EnhancedAIService:
         response = await chat.send_message(UserMessage(text=architecture_prompt))
         
         try:
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
+            json_match = JSON_OBJECT_RE.search(response)
             if json_match:
                 return json.loads(json_match.group())
         except:
@@ -239,8 +266,13 @@ class EnhancedAIService:
             "styling": "Tailwind CSS with custom components"
         }
     
-    async def _generate_complete_application(self, prompt: str, architecture: Dict[str, Any], analysis: Dict[str, Any], session_id: str) -> Dict[str, Any]:
-        """Generate COMPLETE production-ready application code"""
+    async def _stream_complete_application(self, prompt: str, architecture: Dict[str, Any], analysis: Dict[str, Any], session_id: str) -> AsyncIterator[Dict[str, Any]]:
+        """Generate COMPLETE production-ready application code
+
+        Yields "code_delta" events with fence-stripped text while the reply
+        streams (when the chat client can stream), then one "code" event with
+        the extracted and cleaned code.
+        """
         
         system_message = """You are Claude, an expert React/JavaScript developer with exceptional capabilities in creating production-ready applications.
 
@@ -340,28 +372,32 @@ class EnhancedAIService:
         Return ONLY the complete JavaScript/React code, no explanations.
         """
         
-        response = await chat.send_message(UserMessage(text=generation_prompt))
+        user_message = UserMessage(text=generation_prompt)
+        stream_message = getattr(chat, "stream_message", None)
+        if stream_message is not None:
+            stripper = FenceStripper()
+            parts = []
+            async for chunk in stream_message(user_message):
+                parts.append(chunk)
+                text = stripper.feed(chunk)
+                if text:
+                    yield {"phase": "code_delta", "text": text}
+            text = stripper.close()
+            if text:
+                yield {"phase": "code_delta", "text": text}
+            response = "".join(parts)
+        else:
+            response = await chat.send_message(user_message)
         
         # Extract and clean the code
-        code = self._extract_and_clean_code(response)
-        
-        return {
-            "code": code,
-            "architecture_used": architecture,
-            "requirements_implemented": analysis
-        }
+        yield {"phase": "code", "code": self._extract_and_clean_code(response)}
     
     def _extract_and_clean_code(self, response_text: str) -> str:
         """Extract and clean the generated code"""
         
         # Try to find code blocks first
-        code_patterns = [
-            r'```(?:javascript|jsx|js|react|typescript|tsx)\n(.*?)```',
-            r'```\n(.*?)```',
-        ]
-        
-        for pattern in code_patterns:
-            match = re.search(pattern, response_text, re.DOTALL)
+        for pattern in CODE_BLOCK_RES:
+            match = pattern.search(response_text)
             if match:
                 code = match.group(1).strip()
                 if len(code) > 500:  # Ensure it's substantial code
@@ -369,20 +405,15 @@ class EnhancedAIService:
         
         # If no code blocks found, try to extract React component
         # Look for React component patterns
-        react_patterns = [
-            r'(import.*?export default.*?;)',
-            r'(function.*?export default.*?;)',
-            r'(const.*?export default.*?;)'
-        ]
-        
-        for pattern in react_patterns:
-            match = re.search(pattern, response_text, re.DOTALL)
+        for pattern in REACT_COMPONENT_RES:
+            match = pattern.search(response_text)
             if match and len(match.group(1)) > 500:
                 return match.group(1).strip()
         
-        # Fallback: return the entire response if it looks like code
+        # Fallback: return the entire response if it looks like code, minus any
+        # fence the patterns above did not recognise (e.g. another language tag)
         if 'import' in response_text and 'export' in response_text:
-            return response_text.strip()
+            return strip_fences(response_text)
         
         # Last resort: generate a basic component
         return f"""import React, {{ useState, useEffect }} from 'react';
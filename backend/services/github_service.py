@@ -2,11 +2,34 @@ import os
 import asyncio
 import json
 import base64
-from typing import Dict, List, Optional, Any
+import zipfile
+from typing import Dict, Iterator, List, Optional, Any
 from datetime import datetime
-import aiohttp
 import uuid
 
+class _ZipChunkSink:
+    """Write-only file object that hands zip output back in chunks"""
+    
+    def __init__(self):
+        self._chunks: List[bytes] = []
+        self._offset = 0
+    
+    def write(self, data) -> int:
+        self._chunks.append(bytes(data))
+        self._offset += len(data)
+        return len(data)
+    
+    def tell(self) -> int:
+        return self._offset
+    
+    def flush(self) -> None:
+        pass
+    
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
 class GitHubService:
     """
     Complete GitHub integration for automatic commits, version control, and code export
@@ -20,6 +43,9 @@ class GitHubService:
         # For demo purposes, create mock GitHub integration
         if not self.github_token:
             self.github_token = "mock_github_token_for_demo"
+        
+        # Upper bound on concurrent blob uploads per commit
+        self.max_parallel_uploads = 8
     
     async def create_repository(self, project_name: str, description: str = "", private: bool = False, user_token: Optional[str] = None) -> Dict[str, Any]:
         """
@@ -68,15 +94,19 @@ class GitHubService:
             # Get current SHA of main branch
             branch_info = await self._get_branch_info(repo_name, "main", token)
             
-            commits_made = []
+            # Upload blobs concurrently, then record them in a single tree and commit
+            semaphore = asyncio.Semaphore(self.max_parallel_uploads)
+            blobs = await asyncio.gather(*[
+                self._create_blob(semaphore, repo_name, file_path, file_content, token)
+                for file_path, file_content in files.items()
+            ])
             
-            for file_path, file_content in files.items():
-                commit_result = await self._commit_file(
-                    repo_name, file_path, file_content, commit_message, branch_info["sha"], token
-                )
-                commits_made.append(commit_result)
-                # Update SHA for next commit
-                branch_info["sha"] = commit_result["commit"]["sha"]
+            tree_sha = await self._create_tree(repo_name, branch_info["sha"], blobs, token)
+            commit_result = await self._create_commit(
+                repo_name, tree_sha, commit_message, branch_info["sha"], token
+            )
+            await self._update_branch_ref(repo_name, "main", commit_result["commit"]["sha"], token)
+            commits_made = [commit_result]
             
             return {
                 "success": True,
@@ -101,6 +131,71 @@ class GitHubService:
             "url": f"https://github.com/user/{repo_name}/tree/{branch}"
         }
     
+    async def _create_blob(self, semaphore: asyncio.Semaphore, repo_name: str, file_path: str, content: str, token: str) -> Dict[str, Any]:
+        """Upload file content as a git blob"""
+        
+        blob_data = {
+            "content": base64.b64encode(content.encode()).decode(),
+            "encoding": "base64"
+        }
+        
+        async with semaphore:
+            # In real implementation, make actual GitHub API call
+            result = await self._make_github_request(
+                "POST",
+                f"/repos/user/{repo_name}/git/blobs",
+                blob_data,
+                token
+            )
+        
+        return {
+            "path": file_path,
+            "mode": "100644",
+            "type": "blob",
+            "sha": result.get("sha", f"blob_sha_{uuid.uuid4().hex}")
+        }
+    
+    async def _create_tree(self, repo_name: str, base_sha: str, blobs: List[Dict[str, Any]], token: str) -> str:
+        """Create a tree containing all uploaded blobs"""
+        
+        result = await self._make_github_request(
+            "POST",
+            f"/repos/user/{repo_name}/git/trees",
+            {"base_tree": base_sha, "tree": blobs},
+            token
+        )
+        return result.get("sha", f"tree_sha_{uuid.uuid4().hex}")
+    
+    async def _create_commit(self, repo_name: str, tree_sha: str, message: str, parent_sha: str, token: str) -> Dict[str, Any]:
+        """Create a commit pointing at the given tree"""
+        
+        result = await self._make_github_request(
+            "POST",
+            f"/repos/user/{repo_name}/git/commits",
+            {"message": message, "tree": tree_sha, "parents": [parent_sha]},
+            token
+        )
+        commit_sha = result.get("sha", f"new_sha_{datetime.now().timestamp()}")
+        
+        return {
+            "tree": tree_sha,
+            "commit": {
+                "sha": commit_sha,
+                "message": message,
+                "url": f"https://github.com/user/{repo_name}/commit/{commit_sha}"
+            }
+        }
+    
+    async def _update_branch_ref(self, repo_name: str, branch: str, commit_sha: str, token: str) -> None:
+        """Move the branch head to the new commit"""
+        
+        await self._make_github_request(
+            "PATCH",
+            f"/repos/user/{repo_name}/git/refs/heads/{branch}",
+            {"sha": commit_sha},
+            token
+        )
+    
     async def _commit_file(self, repo_name: str, file_path: str, content: str, message: str, parent_sha: str, token: str) -> Dict[str, Any]:
         """Commit a single file to repository"""
         
@@ -151,14 +246,7 @@ class GitHubService:
         try:
             token = user_token or self.github_token
             
-            # Create project structure
-            file_structure = await self._organize_project_structure(project_files)
-            
-            # Generate additional necessary files
-            additional_files = await self._generate_project_files(project_files)
-            
-            # Combine all files
-            all_files = {**file_structure, **additional_files}
+            all_files = await self.build_codebase_files(project_files)
             
             export_result = {
                 "success": True,
@@ -182,6 +270,28 @@ class GitHubService:
                 "message": "Failed to export codebase"
             }
     
+    async def build_codebase_files(self, project_files: Dict[str, str]) -> Dict[str, str]:
+        """Lay out project files and add the generated boilerplate"""
+        
+        # Create project structure
+        file_structure = await self._organize_project_structure(project_files)
+        
+        # Generate additional necessary files
+        additional_files = await self._generate_project_files(project_files)
+        
+        # Combine all files
+        return {**file_structure, **additional_files}
+    
+    def iter_codebase_zip(self, files: Dict[str, str]) -> Iterator[bytes]:
+        """Yield a zip archive of the given files, one compressed entry at a time"""
+        
+        sink = _ZipChunkSink()
+        with zipfile.ZipFile(sink, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            for file_path, content in files.items():
+                archive.writestr(file_path, content)
+                yield sink.drain()
+        yield sink.drain()
+    
     async def _organize_project_structure(self, project_files: Dict[str, str]) -> Dict[str, str]:
         """Organize files into proper project structure"""
         
@@ -2,10 +2,58 @@ import os
 import asyncio
 import uuid
 import mimetypes
-from typing import Dict, List, Optional, Any, BinaryIO
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Any, AsyncIterator, BinaryIO
 from datetime import datetime
 import aiofiles
 from pathlib import Path
+from models.common import utc_now
+
+# Resized copies produced for every uploaded image
+IMAGE_VARIANT_SIZES = {
+    "thumbnail": (256, 256),
+    "medium": (1024, 1024),
+}
+
+# Read size when copying stored chunks into the assembled file
+COPY_CHUNK_SIZE = 64 * 1024
+
+_image_pool: Optional[ProcessPoolExecutor] = None
+
+def _get_image_pool() -> ProcessPoolExecutor:
+    """Return the process pool used for image work, creating it on first use"""
+    global _image_pool
+    if _image_pool is None:
+        # Workers start from a clean forkserver process instead of forking the
+        # running server with its event loop, threads and open connections
+        _image_pool = ProcessPoolExecutor(
+            max_workers=os.cpu_count(),
+            mp_context=multiprocessing.get_context("forkserver")
+        )
+    return _image_pool
+
+def _render_image_variants(original_path: str, file_id: str) -> Dict[str, str]:
+    """Resize an image into WebP variants; runs inside a worker process"""
+    from PIL import Image, ImageOps
+    
+    variants = {"original": original_path}
+    source = Path(original_path)
+    
+    with Image.open(source) as image:
+        # Apply EXIF orientation, then drop metadata by re-encoding
+        image = ImageOps.exif_transpose(image)
+        if image.mode not in ("RGB", "RGBA"):
+            image = image.convert("RGBA")
+        
+        for name, size in IMAGE_VARIANT_SIZES.items():
+            variant = image.copy()
+            variant.thumbnail(size)
+            variant_path = source.with_name(f"{file_id}_{name}.webp")
+            variant.save(variant_path, "WEBP", quality=85)
+            variants[name] = str(variant_path)
+    
+    return variants
 
 class MediaService:
     """
@@ -41,13 +89,13 @@ class MediaService:
         for directory in directories:
             directory.mkdir(parents=True, exist_ok=True)
     
-    async def upload_image(self, file_data: bytes, filename: str, project_id: Optional[str] = None) -> Dict[str, Any]:
+    async def upload_image(self, chunks: AsyncIterator[bytes], filename: str, project_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Upload and process images with optimization
         """
         try:
             # Validate file
-            validation = await self._validate_file(file_data, filename, "image")
+            validation = await self._validate_file(filename, "image")
             if not validation["valid"]:
                 return {
                     "success": False,
@@ -69,9 +117,14 @@ class MediaService:
             save_dir.mkdir(parents=True, exist_ok=True)
             file_path = save_dir / new_filename
             
-            # Save original file
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(file_data)
+            # Stream original file to disk
+            saved = await self._save_stream(chunks, file_path)
+            if not saved["valid"]:
+                return {
+                    "success": False,
+                    "error": saved["error"],
+                    "message": "Image validation failed"
+                }
             
             # Generate image variants (thumbnails, etc.)
             variants = await self._generate_image_variants(file_path, file_id)
@@ -83,9 +136,9 @@ class MediaService:
                 "stored_filename": new_filename,
                 "file_path": str(file_path),
                 "project_id": project_id,
-                "size": len(file_data),
+                "size": saved["size"],
                 "mime_type": validation["mime_type"],
-                "created_at": datetime.utcnow(),
+                "created_at": utc_now(),
                 "variants": variants,
                 "url": f"/uploads/images/{project_id or 'general'}/{new_filename}",
                 "public_url": f"https://your-domain.com/uploads/images/{project_id or 'general'}/{new_filename}"
@@ -104,13 +157,13 @@ class MediaService:
                 "message": "Failed to upload image"
             }
     
-    async def upload_file(self, file_data: bytes, filename: str, project_id: Optional[str] = None) -> Dict[str, Any]:
+    async def upload_file(self, chunks: AsyncIterator[bytes], filename: str, project_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Upload general files with validation
         """
         try:
             # Validate file
-            validation = await self._validate_file(file_data, filename, "file")
+            validation = await self._validate_file(filename, "file")
             if not validation["valid"]:
                 return {
                     "success": False,
@@ -132,9 +185,14 @@ class MediaService:
             save_dir.mkdir(parents=True, exist_ok=True)
             file_path = save_dir / new_filename
             
-            # Save file
-            async with aiofiles.open(file_path, 'wb') as f:
-                await f.write(file_data)
+            # Stream file to disk
+            saved = await self._save_stream(chunks, file_path)
+            if not saved["valid"]:
+                return {
+                    "success": False,
+                    "error": saved["error"],
+                    "message": "File validation failed"
+                }
             
             # Create file record
             file_record = {
@@ -143,9 +201,9 @@ class MediaService:
                 "stored_filename": new_filename,
                 "file_path": str(file_path),
                 "project_id": project_id,
-                "size": len(file_data),
+                "size": saved["size"],
                 "mime_type": validation["mime_type"],
-                "created_at": datetime.utcnow(),
+                "created_at": utc_now(),
                 "url": f"/uploads/files/{project_id or 'general'}/{new_filename}",
                 "download_url": f"/api/media/download/{file_id}"
             }
@@ -163,15 +221,8 @@ class MediaService:
                 "message": "Failed to upload file"
             }
     
-    async def _validate_file(self, file_data: bytes, filename: str, file_type: str) -> Dict[str, Any]:
-        """Validate uploaded file"""
-        
-        # Check file size
-        if len(file_data) > self.max_file_size:
-            return {
-                "valid": False,
-                "error": f"File size exceeds maximum allowed size ({self.max_file_size / (1024*1024)}MB)"
-            }
+    async def _validate_file(self, filename: str, file_type: str) -> Dict[str, Any]:
+        """Validate uploaded file name and type before reading its content"""
         
         # Check file extension and MIME type
         mime_type, _ = mimetypes.guess_type(filename)
@@ -189,8 +240,31 @@ class MediaService:
                 "error": f"File type {mime_type} not allowed"
             }
         
-        # Additional security checks
-        if len(file_data) == 0:
+        return {
+            "valid": True,
+            "mime_type": mime_type
+        }
+    
+    async def _save_stream(self, chunks: AsyncIterator[bytes], file_path: Path) -> Dict[str, Any]:
+        """Write an upload to disk chunk by chunk, enforcing the size limits"""
+        
+        size = 0
+        async with aiofiles.open(file_path, 'wb') as f:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > self.max_file_size:
+                    break
+                await f.write(chunk)
+        
+        if size > self.max_file_size:
+            file_path.unlink(missing_ok=True)
+            return {
+                "valid": False,
+                "error": f"File size exceeds maximum allowed size ({self.max_file_size / (1024*1024)}MB)"
+            }
+        
+        if size == 0:
+            file_path.unlink(missing_ok=True)
             return {
                 "valid": False,
                 "error": "Empty file not allowed"
@@ -198,27 +272,27 @@ class MediaService:
         
         return {
             "valid": True,
-            "mime_type": mime_type
+            "size": size
         }
     
     async def _generate_image_variants(self, original_path: Path, file_id: str) -> Dict[str, str]:
-        """Generate image variants (thumbnails, etc.)"""
-        
-        variants = {}
+        """Generate image variants (thumbnails, etc.) in the image process pool"""
         
         try:
-            # For now, return the original image as variants
-            # In a real implementation, you'd use PIL or similar to create thumbnails
-            
-            variants["original"] = str(original_path)
-            variants["thumbnail"] = str(original_path)  # Would be actual thumbnail
-            variants["medium"] = str(original_path)     # Would be medium size
-            
-        except Exception as e:
-            # If variant generation fails, just use original
-            variants["original"] = str(original_path)
-        
-        return variants
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(
+                _get_image_pool(), _render_image_variants, str(original_path), file_id
+            )
+        except Exception:
+            # If variant generation fails (e.g. SVG), fall back to the original
+            return {name: str(original_path) for name in ("original", *IMAGE_VARIANT_SIZES)}
+    
+    def close(self):
+        """Shut down the image process pool"""
+        global _image_pool
+        if _image_pool is not None:
+            _image_pool.shutdown(wait=False, cancel_futures=True)
+            _image_pool = None
     
     async def chunked_upload_start(self, filename: str, file_size: int, chunk_size: int = 1024*1024) -> Dict[str, Any]:
         """
@@ -243,7 +317,7 @@ class MediaService:
                 "total_chunks": total_chunks,
                 "chunks_received": 0,
                 "temp_dir": str(temp_dir),
-                "created_at": datetime.utcnow(),
+                "created_at": utc_now(),
                 "status": "active"
             }
             
@@ -260,7 +334,7 @@ class MediaService:
                 "message": "Failed to start chunked upload"
             }
     
-    async def chunked_upload_chunk(self, upload_id: str, chunk_number: int, chunk_data: bytes) -> Dict[str, Any]:
+    async def chunked_upload_chunk(self, upload_id: str, chunk_number: int, chunks: AsyncIterator[bytes]) -> Dict[str, Any]:
         """
         Upload a single chunk
         """
@@ -274,15 +348,18 @@ class MediaService:
                     "message": "Invalid upload session"
                 }
             
-            # Save chunk
+            # Stream chunk to disk
             chunk_path = temp_dir / f"chunk_{chunk_number:06d}"
+            chunk_size = 0
             async with aiofiles.open(chunk_path, 'wb') as f:
-                await f.write(chunk_data)
+                async for data in chunks:
+                    chunk_size += len(data)
+                    await f.write(data)
             
             return {
                 "success": True,
                 "chunk_number": chunk_number,
-                "chunk_size": len(chunk_data),
+                "chunk_size": chunk_size,
                 "message": f"Chunk {chunk_number} uploaded successfully"
             }
         
@@ -331,8 +408,8 @@ class MediaService:
             async with aiofiles.open(final_path, 'wb') as final_file:
                 for chunk_file in chunk_files:
                     async with aiofiles.open(chunk_file, 'rb') as chunk:
-                        data = await chunk.read()
-                        await final_file.write(data)
+                        while data := await chunk.read(COPY_CHUNK_SIZE):
+                            await final_file.write(data)
             
             # Get final file size
             final_size = final_path.stat().st_size
@@ -348,7 +425,7 @@ class MediaService:
                     "file_path": str(final_path),
                     "size": final_size,
                     "project_id": project_id,
-                    "created_at": datetime.utcnow()
+                    "created_at": utc_now()
                 },
                 "message": "Chunked upload completed successfully"
             }
@@ -383,7 +460,7 @@ class MediaService:
                 "filename": f"file_{file_id}.jpg",
                 "size": 1024000,
                 "mime_type": "image/jpeg",
-                "created_at": datetime.utcnow(),
+                "created_at": utc_now(),
                 "url": f"/uploads/images/general/{file_id}.jpg"
             }
         }
@@ -1,12 +1,60 @@
 import os
 import json
-import uuid
 import aiofiles
-from typing import List, Dict, Any
-from datetime import datetime
+from typing import List, Dict, Any, Optional
 from motor.motor_asyncio import AsyncIOMotorDatabase
 from fastapi import HTTPException, status
 from models.project_extended import Project, ProjectVersion, ProjectCollaborator
+from models.common import new_id, utc_now
+from infrastructure.mongo_pool import NO_ID_PROJECTION
+from infrastructure.pagination import decode_cursor, keyset_filter
+
+# Listing orders; each ends in the unique id so keyset cursors are unambiguous
+USER_PROJECTS_SORT = [("updated_at", -1), ("id", -1)]
+PUBLIC_PROJECTS_SORT = [("is_featured", -1), ("likes_count", -1), ("created_at", -1), ("id", -1)]
+
+def _page_query(query: Dict[str, Any], sort, cursor: Optional[str]) -> Dict[str, Any]:
+    """Restrict a listing query to documents after `cursor`"""
+    if not cursor:
+        return query
+    try:
+        values = decode_cursor(cursor, sort)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor")
+    return {"$and": [query, keyset_filter(sort, values)]}
+
+# Only what codebase search and its access check need from a project
+PROJECT_FILES_PROJECTION = {
+    "_id": 0,
+    "is_public": 1,
+    "owner_id": 1,
+    "collaborators.user_id": 1,
+    "generated_code": 1,
+    "versions.version": 1,
+    "versions.code": 1
+}
+
+# Enough of a project to check access and build its ETag
+PROJECT_VERSION_PROJECTION = {
+    "_id": 0,
+    "is_public": 1,
+    "owner_id": 1,
+    "collaborators.user_id": 1,
+    "updated_at": 1
+}
+
+def _check_access(project: Dict[str, Any], user_id: Optional[str]) -> None:
+    """Same access rules as get_project_by_id, on a raw (possibly projected) document"""
+    if project.get("is_public"):
+        return
+    if not user_id:
+        raise HTTPException(status_code=401, detail="Authentication required")
+    has_access = (
+        project.get("owner_id") == user_id or
+        any(c.get("user_id") == user_id for c in project.get("collaborators", []))
+    )
+    if not has_access:
+        raise HTTPException(status_code=403, detail="Access denied")
 
 class ProjectService:
     def __init__(self, db: AsyncIOMotorDatabase):
@@ -15,8 +63,11 @@ class ProjectService:
     async def create_project(self, project_data: dict, owner_id: str) -> Project:
         """Create a new project"""
         # Generate UUID for project
-        project_data["id"] = str(uuid.uuid4())
+        project_data["id"] = new_id()
         project_data["owner_id"] = owner_id
+        now = utc_now()
+        project_data["created_at"] = now
+        project_data["updated_at"] = now
         
         # If template_id is provided, get template code
         if project_data.get("template_id"):
@@ -26,7 +77,7 @@ class ProjectService:
         
         # Add initial collaborator (owner)
         project_data["collaborators"] = [
-            ProjectCollaborator(user_id=owner_id, role="owner").dict()
+            ProjectCollaborator(user_id=owner_id, role="owner", added_at=now).model_dump()
         ]
         
         # Create initial version
@@ -34,37 +85,67 @@ class ProjectService:
             initial_version = ProjectVersion(
                 version="1.0.0",
                 code=project_data["generated_code"],
-                description="Initial version"
+                description="Initial version",
+                created_at=now
             )
-            project_data["versions"] = [initial_version.dict()]
+            project_data["versions"] = [initial_version.model_dump()]
         
         project = Project(**project_data)
-        await self.db.projects.insert_one(project.dict())
+        await self.db.projects.insert_one(project.model_dump())
         
         return project
     
-    async def get_user_projects(self, user_id: str, skip: int = 0, limit: int = 20) -> List[Project]:
-        """Get projects for a specific user"""
-        projects = await self.db.projects.find({
+    async def get_user_projects(self, user_id: str, skip: int = 0, limit: int = 20, cursor: Optional[str] = None) -> List[Project]:
+        """Get projects for a specific user, after `cursor` when given"""
+        query = _page_query({
             "$or": [
                 {"owner_id": user_id},
                 {"collaborators.user_id": user_id}
             ]
-        }).sort("updated_at", -1).skip(skip).limit(limit).to_list(limit)
+        }, USER_PROJECTS_SORT, cursor)
+        projects = await self.db.projects.find(
+            query, NO_ID_PROJECTION
+        ).sort(USER_PROJECTS_SORT).skip(0 if cursor else skip).limit(limit).batch_size(limit).to_list(limit)
+        
+        return [Project.model_construct(**project) for project in projects]
+    
+    async def get_public_projects(self, skip: int = 0, limit: int = 20, cursor: Optional[str] = None) -> List[Project]:
+        """Get public projects, after `cursor` when given"""
+        query = _page_query({"is_public": True}, PUBLIC_PROJECTS_SORT, cursor)
+        projects = await self.db.projects.find(
+            query, NO_ID_PROJECTION
+        ).sort(PUBLIC_PROJECTS_SORT).skip(0 if cursor else skip).limit(limit).batch_size(limit).to_list(limit)
+        
+        return [Project.model_construct(**project) for project in projects]
+    
+    async def get_project_files(self, project_id: str, user_id: str = None) -> List[Dict[str, str]]:
+        """Get a project's current code and saved versions as {path, content} files, in one query"""
+        project = await self.db.projects.find_one({"id": project_id}, PROJECT_FILES_PROJECTION)
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
         
-        return [Project(**project) for project in projects]
+        _check_access(project, user_id)
+        
+        files = []
+        if project.get("generated_code"):
+            files.append({"path": "src/App.jsx", "content": project["generated_code"]})
+        for version in reversed(project.get("versions", [])):
+            files.append({
+                "path": f"versions/{version.get('version')}/src/App.jsx",
+                "content": version.get("code", "")
+            })
+        return files
     
-    async def get_public_projects(self, skip: int = 0, limit: int = 20) -> List[Project]:
-        """Get public projects"""
-        projects = await self.db.projects.find({
-            "is_public": True
-        }).sort([
-            ("is_featured", -1),
-            ("likes_count", -1),
-            ("created_at", -1)
-        ]).skip(skip).limit(limit).to_list(limit)
-        
-        return [Project(**project) for project in projects]
+    async def get_project_updated_at(self, project_id: str, user_id: str = None):
+        """Get a project's last update time after checking access, without loading it"""
+        project = await self.db.projects.find_one({"id": project_id}, PROJECT_VERSION_PROJECTION)
+        
+        if not project:
+            raise HTTPException(status_code=404, detail="Project not found")
+        
+        _check_access(project, user_id)
+        return project["updated_at"]
     
     async def get_project_by_id(self, project_id: str, user_id: str = None) -> Project:
         """Get project by ID with access control"""
@@ -89,13 +170,16 @@ class ProjectService:
             if not has_access:
                 raise HTTPException(status_code=403, detail="Access denied")
         
-        # Increment view count
+        await self.record_view(project_id)
+        
+        return project_obj
+    
+    async def record_view(self, project_id: str):
+        """Increment view count; views alone do not change updated_at (the ETag)"""
         await self.db.projects.update_one(
             {"id": project_id},
             {"$inc": {"views_count": 1}}
         )
-        
-        return project_obj
     
     async def update_project(self, project_id: str, update_data: dict, user_id: str) -> Project:
         """Update project"""
@@ -111,7 +195,7 @@ class ProjectService:
             if user_role not in ["owner", "editor"]:
                 raise HTTPException(status_code=403, detail="No edit permissions")
         
-        update_data["updated_at"] = datetime.utcnow()
+        update_data["updated_at"] = utc_now()
         
         await self.db.projects.update_one(
             {"id": project_id},
@@ -152,7 +236,7 @@ class ProjectService:
         # Increment fork count on original
         await self.db.projects.update_one(
             {"id": project_id},
-            {"$inc": {"forks_count": 1}}
+            {"$inc": {"forks_count": 1}, "$set": {"updated_at": utc_now()}}
         )
         
         return fork
@@ -178,7 +262,10 @@ class ProjectService:
         
         await self.db.projects.update_one(
             {"id": project_id},
-            {"$push": {"collaborators": new_collaborator.dict()}}
+            {
+                "$push": {"collaborators": new_collaborator.model_dump()},
+                "$set": {"updated_at": utc_now()}
+            }
         )
         
         return True
@@ -211,9 +298,9 @@ class ProjectService:
                 "$set": {
                     "generated_code": code,
                     "current_version": version_number,
-                    "updated_at": datetime.utcnow()
+                    "updated_at": utc_now()
                 },
-                "$push": {"versions": new_version.dict()}
+                "$push": {"versions": new_version.model_dump()}
             }
         )
         
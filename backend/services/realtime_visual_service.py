@@ -2,7 +2,7 @@ import os
 import json
 import asyncio
 from typing import Dict, List, Optional, Any
-from datetime import datetime
+from models.common import utc_now
 
 class RealtimeVisualService:
     """
@@ -27,8 +27,8 @@ class RealtimeVisualService:
                 "current_code": initial_code,
                 "component_tree": parsed_structure,
                 "change_history": [],
-                "created_at": datetime.utcnow(),
-                "last_update": datetime.utcnow()
+                "created_at": utc_now(),
+                "last_update": utc_now()
             }
             
             self.active_sessions[session_id] = session
@@ -67,7 +67,7 @@ class RealtimeVisualService:
             
             # Create change record
             change_record = {
-                "timestamp": datetime.utcnow(),
+                "timestamp": utc_now(),
                 "change_type": change["type"],
                 "component_id": change.get("component_id"),
                 "old_value": change.get("old_value"),
@@ -79,7 +79,7 @@ class RealtimeVisualService:
             session["current_code"] = updated_code
             session["component_tree"] = updated_tree
             session["change_history"].append(change_record)
-            session["last_update"] = datetime.utcnow()
+            session["last_update"] = utc_now()
             
             # Generate hot reload patch
             hot_reload_patch = await self._generate_hot_reload_patch(change, updated_code)
@@ -1,10 +1,22 @@
 import os
+import re
 import asyncio
 import json
 from typing import Dict, List, Optional, Any
-from datetime import datetime
-import aiohttp
 import uuid
+from emergentintegrations.llm.chat import LlmChat, UserMessage
+from models.common import utc_now
+
+JSON_OBJECT_RE = re.compile(r'\{.*\}', re.DOTALL)
+
+DB_CHAT_SYSTEM_MESSAGE = """You are a Supabase database expert.
+                Convert natural language requests into proper database operations.
+                
+                Return JSON with:
+                - operation_type: create_table, insert_data, query_data, update_schema, etc.
+                - sql: The SQL command to execute
+                - explanation: Human-readable explanation
+                """
 
 class SupabaseService:
     """
@@ -16,6 +28,7 @@ class SupabaseService:
         self.supabase_url = os.environ.get('SUPABASE_URL')
         self.supabase_key = os.environ.get('SUPABASE_ANON_KEY')
         self.supabase_service_key = os.environ.get('SUPABASE_SERVICE_KEY')
+        self.llm_api_key = os.environ.get('EMERGENT_LLM_KEY')
         
         # For demo purposes, we'll create a mock Supabase interface
         # In production, you'd use the actual Supabase credentials
@@ -84,7 +97,7 @@ class SupabaseService:
         return {
             "success": True,
             "sql": sql,
-            "executed_at": datetime.utcnow().isoformat()
+            "executed_at": utc_now().isoformat()
         }
     
     async def setup_authentication(self, project_id: str, auth_config: Dict[str, Any]) -> Dict[str, Any]:
@@ -316,32 +329,21 @@ export const supabase = createClient(supabaseUrl, supabaseKey)
         Convert natural language to database operations (like Lovable's chat interface)
         """
         try:
-            from services.agent_service import AgentService
-            
-            agent = AgentService()
-            
             # Use AI to interpret the database request
-            chat = agent.LlmChat(
-                api_key=agent.api_key,
+            chat = LlmChat(
+                api_key=self.llm_api_key,
                 session_id=f"db_chat_{project_id}",
-                system_message=agent.SystemMessage(text="""You are a Supabase database expert.
-                Convert natural language requests into proper database operations.
-                
-                Return JSON with:
-                - operation_type: create_table, insert_data, query_data, update_schema, etc.
-                - sql: The SQL command to execute
-                - explanation: Human-readable explanation
-                """)
+                system_message=DB_CHAT_SYSTEM_MESSAGE
             ).with_model("anthropic", "claude-3-5-sonnet-20241022")
             
             response = await chat.send_message(
-                agent.UserMessage(text=f"Database request: {natural_language_query}")
+                UserMessage(text=f"Database request: {natural_language_query}")
             )
+            response_text = response if isinstance(response, str) else getattr(response, 'text', str(response))
             
             # Parse AI response
             try:
-                import re
-                json_match = re.search(r'\{.*\}', response.text, re.DOTALL)
+                json_match = JSON_OBJECT_RE.search(response_text)
                 if json_match:
                     result = json.loads(json_match.group())
                 else:
@@ -1,8 +1,10 @@
 from typing import List, Dict, Any
-from datetime import datetime
 from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import UpdateOne
 from fastapi import HTTPException
 from models.template import Template, TemplateCreate
+from models.common import utc_now
+from infrastructure.mongo_pool import NO_ID_PROJECTION
 
 class TemplateService:
     def __init__(self, db: AsyncIOMotorDatabase):
@@ -10,11 +12,11 @@ class TemplateService:
     
     async def create_template(self, template_data: TemplateCreate, author_id: str) -> Template:
         """Create a new template"""
-        template_dict = template_data.dict()
+        template_dict = template_data.model_dump()
         template_dict["author_id"] = author_id
         
         template = Template(**template_dict)
-        result = await self.db.templates.insert_one(template.dict())
+        result = await self.db.templates.insert_one(template.model_dump())
         template.id = str(result.inserted_id)
         
         return template
@@ -27,13 +29,22 @@ class TemplateService:
         
         query["is_public"] = True
         
-        templates = await self.db.templates.find(query).sort([
+        templates = await self.db.templates.find(query, NO_ID_PROJECTION).sort([
             ("is_featured", -1),
             ("usage_count", -1),
             ("created_at", -1)
-        ]).skip(skip).limit(limit).to_list(limit)
+        ]).skip(skip).limit(limit).batch_size(limit).to_list(limit)
         
-        return [Template(**template) for template in templates]
+        return [Template.model_construct(**template) for template in templates]
+    
+    async def get_template_updated_at(self, template_id: str):
+        """Get a template's last update time without loading it"""
+        template = await self.db.templates.find_one({"id": template_id}, {"_id": 0, "updated_at": 1})
+        
+        if not template:
+            raise HTTPException(status_code=404, detail="Template not found")
+        
+        return template["updated_at"]
     
     async def get_template_by_id(self, template_id: str) -> Template:
         """Get template by ID"""
@@ -49,9 +60,9 @@ class TemplateService:
         templates = await self.db.templates.find({
             "is_featured": True,
             "is_public": True
-        }).sort("usage_count", -1).limit(limit).to_list(limit)
+        }, NO_ID_PROJECTION).sort("usage_count", -1).limit(limit).batch_size(limit).to_list(limit)
         
-        return [Template(**template) for template in templates]
+        return [Template.model_construct(**template) for template in templates]
     
     async def search_templates(self, query: str, skip: int = 0, limit: int = 20) -> List[Template]:
         """Search templates by name, description, or tags"""
@@ -64,18 +75,18 @@ class TemplateService:
             ]
         }
         
-        templates = await self.db.templates.find(search_query).sort([
+        templates = await self.db.templates.find(search_query, NO_ID_PROJECTION).sort([
             ("usage_count", -1),
             ("created_at", -1)
-        ]).skip(skip).limit(limit).to_list(limit)
+        ]).skip(skip).limit(limit).batch_size(limit).to_list(limit)
         
-        return [Template(**template) for template in templates]
+        return [Template.model_construct(**template) for template in templates]
     
     async def use_template(self, template_id: str) -> Template:
         """Increment usage count for template"""
         await self.db.templates.update_one(
             {"id": template_id},
-            {"$inc": {"usage_count": 1}}
+            {"$inc": {"usage_count": 1}, "$set": {"updated_at": utc_now()}}
         )
         
         return await self.get_template_by_id(template_id)
@@ -96,7 +107,7 @@ class TemplateService:
             })
             await self.db.templates.update_one(
                 {"id": template_id},
-                {"$inc": {"likes_count": -1}}
+                {"$inc": {"likes_count": -1}, "$set": {"updated_at": utc_now()}}
             )
             return False
         else:
@@ -104,11 +115,11 @@ class TemplateService:
             await self.db.template_likes.insert_one({
                 "template_id": template_id,
                 "user_id": user_id,
-                "created_at": datetime.utcnow()
+                "created_at": utc_now()
             })
             await self.db.templates.update_one(
                 {"id": template_id},
-                {"$inc": {"likes_count": 1}}
+                {"$inc": {"likes_count": 1}, "$set": {"updated_at": utc_now()}}
             )
             return True
     
@@ -274,8 +285,12 @@ export default App;""",
             }
         ]
         
-        for template_data in default_templates:
-            existing = await self.db.templates.find_one({"name": template_data["name"]})
-            if not existing:
-                template = Template(**template_data)
-                await self.db.templates.insert_one(template.dict())
\ No newline at end of file
+        # One round trip: insert each default only if no template has its name yet
+        await self.db.templates.bulk_write([
+            UpdateOne(
+                {"name": template_data["name"]},
+                {"$setOnInsert": Template(**template_data).model_dump()},
+                upsert=True
+            )
+            for template_data in default_templates
+        ], ordered=False)
\ No newline at end of file